@@ -0,0 +1 @@
+"""Benchmarks do pipeline de risco cardiaco com dados sinteticos."""
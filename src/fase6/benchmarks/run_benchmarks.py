@@ -0,0 +1,324 @@
+"""
+Benchmark das etapas do pipeline em dados sinteticos (100k a 50M linhas).
+
+Uso (a partir de src/fase6):
+
+    python -m benchmarks.run_benchmarks --escalas 100k 1m
+    python -m benchmarks.run_benchmarks --escalas 10m --max-linhas-treino 500000
+
+Cada execucao e gravada no historico (``--historico``, padrao
+``benchmarks/resultados/historico.jsonl``, fora do git) e comparada com a
+mediana das execucoes anteriores na mesma maquina e escala; o processo sai com
+codigo 1 se alguma etapa ficou mais lenta ou usou mais memoria que a
+tolerancia. A maquina e identificada pelo modelo da CPU, nucleos disponiveis e
+versao do Python, ou por ``--maquina``. Em CI, aponte ``--historico`` para um
+arquivo persistido entre execucoes (cache ou artefato). Roda sem rede.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from cardio_ai_model.config import TrainingConfig, get_default_config
+from cardio_ai_model.datapipeline.analysis import calculate_permutation_importance
+from cardio_ai_model.datapipeline.data_pipeline import (
+    drop_flagged_outliers,
+    engineer_features,
+    flag_clinical_outliers,
+    flag_duplicate_rows,
+    load_dataset,
+    split_train_test,
+    summarize_clinical_outliers,
+    transform_base,
+)
+from cardio_ai_model.datapipeline.evaluation import evaluate_model
+from cardio_ai_model.runtime.profiling import format_profile_report, profiling
+from cardio_ai_model.training.training import train_gradient_boosting
+
+from .synthetic import SCALES, write_synthetic_dataset
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEFAULT_DATA_DIR = BENCHMARKS_DIR / "dados"
+DEFAULT_HISTORY_PATH = BENCHMARKS_DIR / "resultados" / "historico.jsonl"
+
+# Diferencas menores que estas sao ruido de medicao, mesmo acima da tolerancia.
+MIN_WALL_DELTA_S = 0.1
+MIN_RSS_DELTA_MB = 32.0
+
+
+@dataclass(frozen=True)
+class Regression:
+    rows: int
+    stage: str
+    metric: str
+    value: float
+    baseline: float
+
+    @property
+    def change(self) -> float:
+        return self.value / self.baseline - 1 if self.baseline > 0 else float("inf")
+
+
+def benchmark_config(dataset_dir: Path, work_dir: Path, args: argparse.Namespace) -> TrainingConfig:
+    # Um unico candidato e sem caches: mede o custo das etapas, nao a busca.
+    return replace(
+        get_default_config(),
+        dataset_path=dataset_dir,
+        model_output_path=work_dir / "modelo.pkl",
+        cache_dir=None,
+        feature_store_dir=None,
+        transformer_cache_dir=None,
+        search_store_path=None,
+        stage_cache_dir=None,
+        model_engine=args.engine,
+        param_grid={"model__n_estimators": [100], "model__learning_rate": [0.1], "model__max_depth": [3]},
+        hist_param_grid={"model__max_iter": [100], "model__learning_rate": [0.1], "model__max_depth": [5]},
+        cv_folds=3,
+        permutation_repeats=3,
+        permutation_sample_size=args.permutation_sample,
+        compute_processes=args.processes,
+        profile_stages=True,
+        profile_python_memory=args.python_memory,
+        profile_dir=work_dir,
+    )
+
+
+def run_scale(n_rows: int, args: argparse.Namespace) -> dict[str, Any]:
+    start = time.perf_counter()
+    dataset_dir = write_synthetic_dataset(n_rows, args.data_dir, args.seed)
+    print(f"\nDados sinteticos ({n_rows} linhas): {dataset_dir} ({time.perf_counter() - start:.1f}s)")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        config = benchmark_config(dataset_dir, Path(work_dir), args)
+        with profiling(config) as profiler:
+            with profiler.span("load_dataset"):
+                df = load_dataset(config)
+            with profiler.span("flag_duplicate_rows"):
+                df = flag_duplicate_rows(df)
+            with profiler.span("transform_base"):
+                df = transform_base(df)
+            with profiler.span("flag_clinical_outliers"):
+                df = flag_clinical_outliers(df, config.outlier_rules)
+            with profiler.span("summarize_clinical_outliers"):
+                summarize_clinical_outliers(df, config.outlier_rules)
+            with profiler.span("drop_flagged_outliers"):
+                df = drop_flagged_outliers(df, config.outlier_rules, config.drop_duplicates)
+            with profiler.span("engineer_features"):
+                df = engineer_features(df)
+            with profiler.span("split_train_test"):
+                x_train, x_test, y_train, y_test, feature_names = split_train_test(df, config)
+            del df
+
+            # x_train ja esta embaralhado pela divisao: as primeiras linhas sao uma amostra.
+            n_train = min(args.max_train_rows, x_train.shape[0])
+            with profiler.span("train_gradient_boosting"):
+                grid = train_gradient_boosting(x_train[:n_train], y_train[:n_train], config, feature_names)
+            with profiler.span("evaluate_model"):
+                evaluation = evaluate_model(grid, x_test, y_test)
+            with profiler.span("calculate_permutation_importance"):
+                calculate_permutation_importance(grid, x_test, y_test, feature_names, config)
+
+        print(format_profile_report(profiler.spans))
+        trace = profiler.trace()
+
+    return {
+        "run_id": trace["run_id"],
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "maquina": machine_key(args.machine),
+        "versoes": trace["versions"],
+        "linhas": n_rows,
+        "linhas_treino": n_train,
+        "engine": args.engine,
+        "processos": args.processes,
+        "memoria_python": args.python_memory,
+        "auc_teste": evaluation.auc,
+        "rss_pico_mb": trace["rss_peak_mb"],
+        "rss_pico_filhos_mb": trace["rss_peak_children_mb"],
+        "etapas": {
+            span["name"]: {
+                "wall_s": span["wall_s"],
+                "cpu_s": span["cpu_s"],
+                "rss_pico_mb": span["rss_peak_mb"],
+                "py_pico_mb": span["py_peak_mb"] if args.python_memory else None,
+            }
+            for span in trace["spans"]
+            if span["depth"] == 0
+        },
+    }
+
+
+def cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def available_cpus() -> int:
+    # Em container, os nucleos liberados ao processo, nao os do host.
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def machine_key(label: str | None = None) -> str:
+    # Sem o hostname: em CI ele muda a cada execucao e nada seria comparavel.
+    if label:
+        return label
+    return f"{cpu_model()}|{available_cpus()}cpu|py{platform.python_version()}"
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def load_history(path: Path) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    with path.open(encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def append_history(path: Path, result: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as file:
+        file.write(json.dumps(result) + "\n")
+
+
+def _comparable(previous: dict[str, Any], result: dict[str, Any]) -> bool:
+    fields = ("maquina", "linhas", "linhas_treino", "engine", "processos")
+    # Execucoes antigas nao tinham o campo e sempre usavam tracemalloc.
+    return all(previous.get(name) == result.get(name) for name in fields) and previous.get(
+        "memoria_python", True
+    ) == result["memoria_python"]
+
+
+def find_regressions(
+    result: dict[str, Any],
+    history: list[dict[str, Any]],
+    baseline_runs: int,
+    tolerance: float,
+) -> tuple[list[Regression], int]:
+    """
+    Compara cada etapa com a mediana das ultimas ``baseline_runs`` execucoes
+    equivalentes (mesma maquina, escala, engine, processos e uso de tracemalloc).
+    """
+    previous = [run for run in history if _comparable(run, result)][-baseline_runs:]
+    regressions = []
+    for stage, metrics in result["etapas"].items():
+        for metric, min_delta in (("wall_s", MIN_WALL_DELTA_S), ("rss_pico_mb", MIN_RSS_DELTA_MB)):
+            values = [
+                run["etapas"][stage][metric]
+                for run in previous
+                if stage in run["etapas"] and run["etapas"][stage][metric] is not None
+            ]
+            value = metrics[metric]
+            if not values or value is None:
+                continue
+            baseline = statistics.median(values)
+            if value > baseline * (1 + tolerance) and value - baseline > min_delta:
+                regressions.append(Regression(result["linhas"], stage, metric, value, baseline))
+    return regressions, len(previous)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", nargs="+", choices=sorted(SCALES), default=["100k"], dest="scales")
+    parser.add_argument(
+        "--engine",
+        choices=("gradient_boosting", "hist_gradient_boosting"),
+        default="hist_gradient_boosting",
+    )
+    parser.add_argument(
+        "--max-linhas-treino",
+        type=int,
+        default=1_000_000,
+        dest="max_train_rows",
+        help="Limite de linhas usadas no treino (a busca com GradientBoosting nao escala a dezenas de milhoes).",
+    )
+    parser.add_argument("--amostra-permutacao", type=int, default=100_000, dest="permutation_sample")
+    parser.add_argument("--processos", type=int, default=None, dest="processes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dados", type=Path, default=DEFAULT_DATA_DIR, dest="data_dir")
+    parser.add_argument("--historico", type=Path, default=DEFAULT_HISTORY_PATH, dest="history_path")
+    parser.add_argument(
+        "--maquina",
+        default=None,
+        dest="machine",
+        help="Rotulo da maquina no historico (padrao: modelo da CPU, nucleos e versao do Python).",
+    )
+    parser.add_argument(
+        "--memoria-python",
+        action="store_true",
+        dest="python_memory",
+        help="Mede tambem a memoria Python com tracemalloc (deixa os tempos mais lentos).",
+    )
+    parser.add_argument("--execucoes-base", type=int, default=5, dest="baseline_runs")
+    parser.add_argument("--tolerancia", type=float, default=0.25, dest="tolerance")
+    parser.add_argument(
+        "--nao-gravar",
+        action="store_true",
+        dest="no_record",
+        help="Compara com o historico sem acrescentar esta execucao.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    history = load_history(args.history_path)
+    regressions: list[Regression] = []
+
+    for scale in args.scales:
+        result = run_scale(SCALES[scale], args)
+        found, n_baseline = find_regressions(result, history, args.baseline_runs, args.tolerance)
+        if n_baseline == 0:
+            print(f"Sem execucoes anteriores comparaveis para {scale}: resultado vira a referencia.")
+        regressions += found
+        if not args.no_record:
+            append_history(args.history_path, result)
+            history.append(result)
+
+    if not regressions:
+        print(f"\nNenhuma regressao acima de {args.tolerance:.0%}.")
+        return 0
+
+    print(f"\n--- Regressoes (tolerancia {args.tolerance:.0%}) ---")
+    print(f"{'Linhas':>10} {'Etapa':<34} {'Metrica':<12} {'Atual':>10} {'Base':>10} {'Variacao':>9}")
+    for item in regressions:
+        print(
+            f"{item.rows:>10} {item.stage:<34} {item.metric:<12} "
+            f"{item.value:>10.2f} {item.baseline:>10.2f} {item.change:>+9.1%}"
+        )
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
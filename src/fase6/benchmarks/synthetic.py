@@ -0,0 +1,178 @@
+"""Gerador de registros sinteticos com o schema de cardio_train.csv."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from cardio_ai_model.config import DATASET_SCHEMA
+
+GENERATOR_VERSION = 1
+
+SCALES: dict[str, int] = {
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+    "50m": 50_000_000,
+}
+
+# Linhas geradas por vez e linhas por arquivo CSV (acima disso o dataset vira
+# um diretorio de shards, como os que o pipeline ja le em paralelo).
+CHUNK_ROWS = 1_000_000
+SHARD_ROWS = 5_000_000
+
+_COMPLETE_MARKER = "_COMPLETO"
+
+# Parametros estimados do Dataset/cardio_train.csv (70k linhas) apos a limpeza.
+_AGE_DAYS = (19_469.0, 2_467.0, 10_798, 23_713)
+_HEIGHT_BY_GENDER = {1: (161.5, 6.6), 2: (170.0, 6.7)}
+_WEIGHT_BY_GENDER = {1: (72.5, 14.1), 2: (77.2, 14.1)}
+_HEIGHT_WEIGHT_CORR = 0.31
+_AP_HI = (126.7, 16.7)
+_AP_LO = (81.3, 9.5)
+_AP_CORR = 0.73
+_AP_ROUND_TO_10 = 0.97
+_CATEGORY_PROBS = {
+    "gender": ([1, 2], [0.65, 0.35]),
+    "cholesterol": ([1, 2, 3], [0.748, 0.137, 0.115]),
+    "gluc": ([1, 2, 3], [0.850, 0.074, 0.076]),
+}
+_BINARY_RATES = {"smoke": 0.088, "alco": 0.054, "active": 0.804}
+
+# Regressao logistica de cardio ajustada nos dados reais (variaveis padronizadas).
+_RISK_INTERCEPT = 0.094
+_RISK_COEFS = {
+    "age": 0.342,
+    "ap_hi": 1.038,
+    "cholesterol_2": 0.420,
+    "cholesterol_3": 1.014,
+    "weight": 0.148,
+    "gluc": -0.147,
+    "smoke": -0.171,
+    "alco": -0.207,
+    "active": -0.229,
+}
+
+# Erros de digitacao na proporcao do dataset real, para exercitar a limpeza.
+_OUTLIER_RATES = {
+    "ap_hi_x10": 0.0006,
+    "ap_hi_div10": 0.0026,
+    "ap_lo_x10": 0.0136,
+    "ap_swapped": 0.0020,
+    "height_low": 0.0019,
+    "weight_low": 0.0001,
+}
+
+
+def _blood_pressure(rng: np.random.Generator, mean: float, std: float, z: np.ndarray) -> np.ndarray:
+    value = mean + std * z
+    rounded = np.round(value / 10) * 10
+    return np.where(rng.random(z.size) < _AP_ROUND_TO_10, rounded, np.round(value))
+
+
+def synthetic_cardio_frame(n_rows: int, rng: np.random.Generator, first_id: int = 0) -> pl.DataFrame:
+    mean_age, std_age, min_age, max_age = _AGE_DAYS
+    age = np.clip(rng.normal(mean_age, std_age, n_rows), min_age, max_age).round()
+
+    values, probs = _CATEGORY_PROBS["gender"]
+    gender = rng.choice(values, size=n_rows, p=probs)
+    is_male = gender == 2
+    z_height = rng.standard_normal(n_rows)
+    z_weight = _HEIGHT_WEIGHT_CORR * z_height + np.sqrt(1 - _HEIGHT_WEIGHT_CORR**2) * rng.standard_normal(
+        n_rows
+    )
+    height = np.where(
+        is_male,
+        _HEIGHT_BY_GENDER[2][0] + _HEIGHT_BY_GENDER[2][1] * z_height,
+        _HEIGHT_BY_GENDER[1][0] + _HEIGHT_BY_GENDER[1][1] * z_height,
+    ).round()
+    weight = np.where(
+        is_male,
+        _WEIGHT_BY_GENDER[2][0] + _WEIGHT_BY_GENDER[2][1] * z_weight,
+        _WEIGHT_BY_GENDER[1][0] + _WEIGHT_BY_GENDER[1][1] * z_weight,
+    ).clip(35, 195).round(1)
+
+    z_hi = rng.standard_normal(n_rows)
+    z_lo = _AP_CORR * z_hi + np.sqrt(1 - _AP_CORR**2) * rng.standard_normal(n_rows)
+    ap_hi = _blood_pressure(rng, *_AP_HI, z_hi)
+    ap_lo = _blood_pressure(rng, *_AP_LO, z_lo)
+
+    categories = {
+        name: rng.choice(values, size=n_rows, p=probs)
+        for name, (values, probs) in _CATEGORY_PROBS.items()
+        if name != "gender"
+    }
+    binaries = {name: (rng.random(n_rows) < rate).astype(np.int8) for name, rate in _BINARY_RATES.items()}
+
+    logit = (
+        _RISK_INTERCEPT
+        + _RISK_COEFS["age"] * (age - mean_age) / std_age
+        + _RISK_COEFS["ap_hi"] * (ap_hi - _AP_HI[0]) / _AP_HI[1]
+        + _RISK_COEFS["cholesterol_2"] * (categories["cholesterol"] == 2)
+        + _RISK_COEFS["cholesterol_3"] * (categories["cholesterol"] == 3)
+        + _RISK_COEFS["weight"] * (weight - 74.2) / 14.4
+        + _RISK_COEFS["gluc"] * (categories["gluc"] > 1)
+        + sum(_RISK_COEFS[name] * binaries[name] for name in _BINARY_RATES)
+    )
+    cardio = (rng.random(n_rows) < 1 / (1 + np.exp(-logit))).astype(np.int8)
+
+    # Erros aplicados depois do alvo: o risco vem dos valores "verdadeiros".
+    ap_hi = np.where(rng.random(n_rows) < _OUTLIER_RATES["ap_hi_x10"], ap_hi * 10, ap_hi)
+    ap_hi = np.where(rng.random(n_rows) < _OUTLIER_RATES["ap_hi_div10"], ap_hi // 10, ap_hi)
+    ap_lo = np.where(rng.random(n_rows) < _OUTLIER_RATES["ap_lo_x10"], ap_lo * 10, ap_lo)
+    swapped = rng.random(n_rows) < _OUTLIER_RATES["ap_swapped"]
+    ap_hi, ap_lo = np.where(swapped, ap_lo, ap_hi), np.where(swapped, ap_hi, ap_lo)
+    height = np.where(rng.random(n_rows) < _OUTLIER_RATES["height_low"], rng.integers(55, 140, n_rows), height)
+    weight = np.where(rng.random(n_rows) < _OUTLIER_RATES["weight_low"], rng.integers(10, 30, n_rows), weight)
+
+    columns = {
+        "id": np.arange(first_id, first_id + n_rows),
+        "age": age,
+        "gender": gender,
+        "height": height,
+        "weight": weight,
+        "ap_hi": ap_hi,
+        "ap_lo": ap_lo,
+        "cholesterol": categories["cholesterol"],
+        "gluc": categories["gluc"],
+        **binaries,
+        "cardio": cardio,
+    }
+    return pl.DataFrame(
+        [pl.Series(name, columns[name]).cast(dtype) for name, dtype in DATASET_SCHEMA.items()]
+    )
+
+
+def synthetic_dataset_dir(data_dir: Path, n_rows: int, seed: int) -> Path:
+    return data_dir / f"cardio_sintetico_{n_rows}_s{seed}_v{GENERATOR_VERSION}"
+
+
+def write_synthetic_dataset(n_rows: int, data_dir: Path, seed: int = 42) -> Path:
+    """
+    Grava ``n_rows`` registros sinteticos em CSVs (separador ``;``) de ate
+    ``SHARD_ROWS`` linhas, gerados em lotes de ``CHUNK_ROWS``. Um diretorio
+    completo e reaproveitado nas execucoes seguintes.
+    """
+    output_dir = synthetic_dataset_dir(data_dir, n_rows, seed)
+    if (output_dir / _COMPLETE_MARKER).exists():
+        return output_dir
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.glob("*.csv"):
+        stale.unlink()
+
+    rng = np.random.default_rng(seed)
+    for shard, shard_start in enumerate(range(0, n_rows, SHARD_ROWS)):
+        shard_end = min(shard_start + SHARD_ROWS, n_rows)
+        with (output_dir / f"parte_{shard:04d}.csv").open("wb") as file:
+            for chunk_start in range(shard_start, shard_end, CHUNK_ROWS):
+                chunk_rows = min(CHUNK_ROWS, shard_end - chunk_start)
+                synthetic_cardio_frame(chunk_rows, rng, first_id=chunk_start).write_csv(
+                    file,
+                    separator=";",
+                    include_header=chunk_start == shard_start,
+                )
+    (output_dir / _COMPLETE_MARKER).touch()
+    return output_dir
@@ -1,9 +1,15 @@
-from .agents import RecomendacaoFinal, RiskScore
-from .config import FEATURE_NAMES, TrainingConfig, get_default_config
+from .config import (
+    DATASET_SCHEMA,
+    FEATURE_NAMES,
+    ClinicalRule,
+    TrainingConfig,
+    get_default_config,
+)
 from .datapipeline import (
     clean_clinical_outliers,
     engineer_features,
     load_dataset,
+    prepare_features,
     split_train_test,
     transform_base,
 )
@@ -13,12 +19,28 @@ __all__ = [
     "TrainingConfig",
     "get_default_config",
     "FEATURE_NAMES",
+    "DATASET_SCHEMA",
+    "ClinicalRule",
     "load_dataset",
     "transform_base",
     "clean_clinical_outliers",
     "engineer_features",
+    "prepare_features",
     "split_train_test",
     "train_gradient_boosting",
     "RecomendacaoFinal",
     "RiskScore",
 ]
+
+
+# Os agentes exigem GEMINI_API_KEY ao importar; carregados so quando usados,
+# treino e workers da busca distribuida nao dependem da chave.
+_AGENT_EXPORTS = {"RecomendacaoFinal", "RiskScore"}
+
+
+def __getattr__(name: str):
+    if name in _AGENT_EXPORTS:
+        from . import agents
+
+        return getattr(agents, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
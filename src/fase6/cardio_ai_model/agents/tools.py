@@ -7,6 +7,7 @@ import numpy as np
 from pydantic import BaseModel
 
 from ..config import FEATURE_NAMES
+from ..datapipeline.inference import decision_threshold, risk_label
 from .protocols import PROTOCOLS_DB
 from .schemas import ProtocoloSaida, RiskScore
 
@@ -20,6 +21,7 @@ class ToolCalcularRiscoCardiaco:
                 f"Modelo nao encontrado em: {model_path}. Execute a Parte 1 antes."
             )
         self.model = joblib.load(model_path)
+        self.threshold = decision_threshold(self.model)
 
     def __call__(self, dados_paciente: dict[str, float | int]) -> RiskScore:
         faltando = [f for f in FEATURE_NAMES if f not in dados_paciente]
@@ -29,7 +31,7 @@ class ToolCalcularRiscoCardiaco:
         x = np.array([[float(dados_paciente[f]) for f in FEATURE_NAMES]])
         probabilidade = float(self.model.predict_proba(x)[0][1])
 
-        classificacao = "ALTO RISCO" if probabilidade >= 0.5 else "BAIXO RISCO"
+        classificacao = risk_label(probabilidade, self.threshold)
 
         return RiskScore(
             probabilidade=probabilidade,
@@ -1,3 +1,19 @@
-from .config import FEATURE_NAMES, TrainingConfig, get_default_config
+from .config import (
+    DATASET_SCHEMA,
+    DEFAULT_OUTLIER_RULES,
+    FEATURE_NAMES,
+    ClinicalCosts,
+    ClinicalRule,
+    TrainingConfig,
+    get_default_config,
+)
 
-__all__ = ["FEATURE_NAMES", "TrainingConfig", "get_default_config"]
+__all__ = [
+    "ClinicalCosts",
+    "ClinicalRule",
+    "DATASET_SCHEMA",
+    "DEFAULT_OUTLIER_RULES",
+    "FEATURE_NAMES",
+    "TrainingConfig",
+    "get_default_config",
+]
@@ -3,6 +3,50 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from pathlib import Path
 
+import polars as pl
+
+DATASET_SCHEMA: dict[str, pl.DataType] = {
+    "id": pl.Int32,
+    "age": pl.Int32,
+    "gender": pl.Int8,
+    "height": pl.Int16,
+    "weight": pl.Float32,
+    "ap_hi": pl.Int16,
+    "ap_lo": pl.Int16,
+    "cholesterol": pl.Int8,
+    "gluc": pl.Int8,
+    "smoke": pl.Int8,
+    "alco": pl.Int8,
+    "active": pl.Int8,
+    "cardio": pl.Int8,
+}
+
+@dataclass(frozen=True)
+class ClinicalRule:
+    name: str
+    column: str
+    min_value: float | None = None
+    max_value: float | None = None
+    greater_than: str | None = None
+
+
+@dataclass(frozen=True)
+class ClinicalCosts:
+    """Custo de cada desfecho da classificacao usado na escolha do limiar."""
+
+    false_negative: float = 5.0
+    false_positive: float = 1.0
+    true_positive: float = 0.0
+    true_negative: float = 0.0
+
+
+DEFAULT_OUTLIER_RULES: tuple[ClinicalRule, ...] = (
+    ClinicalRule("ap_hi_faixa", "ap_hi", min_value=60, max_value=250),
+    ClinicalRule("ap_lo_faixa", "ap_lo", min_value=40, max_value=200),
+    ClinicalRule("ap_hi_maior_ap_lo", "ap_hi", greater_than="ap_lo"),
+    ClinicalRule("height_faixa", "height", min_value=140, max_value=220),
+    ClinicalRule("weight_faixa", "weight", min_value=30, max_value=200),
+)
 
 FEATURE_NAMES: list[str] = [
     "gender",
@@ -26,12 +70,56 @@ class TrainingConfig:
     dataset_path: Path
     model_output_path: Path
     separator: str = ";"
+    pipeline_mode: str = "eager"
+    shard_workers: int | None = None
+    cache_dir: Path | None = None
+    feature_store_dir: Path | None = None
     test_size: float = 0.2
     random_state: int = 42
     cv_folds: int = 5
     scoring: str = "f1"
     permutation_repeats: int = 10
+    correlation_method: str = "pearson"
+    permutation_sample_size: int | None = None
+    bootstrap_replicates: int = 2000
+    bootstrap_confidence: float = 0.95
+    threshold_objective: str = "fixed"
+    decision_threshold: float = 0.5
+    threshold_costs: ClinicalCosts = ClinicalCosts()
+    target_recall: float = 0.9
+    report_mode: bool = False
+    report_formats: tuple[str, ...] = ("png", "svg")
+    report_processes: int = 1
+    stage_cache_dir: Path | None = None
+    stage_workers: int = 2
+    profile_stages: bool = False
+    profile_cprofile: bool = False
+    profile_python_memory: bool = True
+    profile_dir: Path | None = None
+    compute_processes: int | None = None
+    threads_per_process: int = 1
+    model_engine: str = "gradient_boosting"
+    categorical_features: tuple[str, ...] = ("cholesterol", "gluc")
+    search_strategy: str = "grid"
+    warm_start_ensembles: bool = True
+    search_store_path: Path | None = None
+    shared_memory_search: bool = True
+    search_backend: str = "local"
+    coordinator_address: tuple[str, int] = ("127.0.0.1", 0)
+    distributed_local_workers: int | None = None
+    distributed_task_timeout_s: float | None = None
+    measure_inference_cost: bool = False
+    latency_budget_ms: float | None = None
+    model_size_budget_bytes: int | None = None
+    transformer_cache_dir: Path | None = None
+    transformer_cache_bytes: int = 512 * 1024 * 1024
+    halving_resource: str = "n_samples"
+    halving_factor: int = 3
+    random_search_iter: int = 20
+    search_time_budget_s: float | None = None
     binary_columns: tuple[str, ...] = ("smoke", "alco", "active")
+    outlier_rules: tuple[ClinicalRule, ...] = DEFAULT_OUTLIER_RULES
+    drop_duplicates: bool = False
     param_grid: dict[str, list[int] | list[float]] = field(
         default_factory=lambda: {
             "model__n_estimators": [100, 200],
@@ -39,6 +127,13 @@ class TrainingConfig:
             "model__max_depth": [3, 5],
         }
     )
+    hist_param_grid: dict[str, list[int] | list[float]] = field(
+        default_factory=lambda: {
+            "model__max_iter": [100, 200],
+            "model__learning_rate": [0.05, 0.1],
+            "model__max_depth": [3, 5],
+        }
+    )
 
 
 def _resolve_dataset_path(base_dir: Path) -> Path:
@@ -60,4 +155,7 @@ def get_default_config() -> TrainingConfig:
     return TrainingConfig(
         dataset_path=_resolve_dataset_path(fase6_dir),
         model_output_path=artifacts_dir / "modelo_risco_cardiaco.pkl",
+        cache_dir=artifacts_dir / "cache",
+        stage_cache_dir=artifacts_dir / "cache" / "stages",
+        search_store_path=artifacts_dir / "busca_hiperparametros.sqlite",
     )
@@ -1,37 +1,114 @@
 from .analysis import (
+	build_correlation_figure,
 	calculate_permutation_importance,
 	plot_correlation_heatmap,
 	print_binary_distributions,
 )
+from .cache import (
+	feature_cache_key,
+	load_cached_features,
+	write_feature_cache,
+)
+from .correlation import CovarianceAccumulator, correlation_matrix
 from .data_pipeline import (
+	CleaningReport,
+	build_feature_plan,
 	clean_clinical_outliers,
+	collect_features,
+	compute_features,
+	compute_sharded_features,
+	drop_flagged_outliers,
 	engineer_features,
+	flag_clinical_outliers,
+	flag_duplicate_rows,
 	load_dataset,
+	outlier_rule_expression,
+	prepare_features,
+	scan_dataset,
 	split_train_test,
+	stratified_split_indices,
+	summarize_clinical_outliers,
 	transform_base,
 )
 from .evaluation import (
+	EvaluationResult,
+	build_confusion_figure,
+	build_feature_importance_figure,
+	build_precision_recall_figure,
+	build_roc_figure,
 	evaluate_model,
+	feature_importance_values,
 	plot_confusion,
 	plot_feature_importance,
+	plot_precision_recall,
 	plot_roc_curve,
 )
-from .inference import predict_patient_risk
+from .feature_store import (
+	ingest_batch,
+	ingest_batches,
+	load_feature_store,
+	scan_feature_store,
+)
+from .inference import decision_threshold, predict_patient_risk
+from .metrics import score_rows
+from .permutation import batched_permutation_importance
 from .persistence import save_model
+from .report import InteractiveFigures, ReportRenderer, open_figure_output
+from .sources import resolve_dataset_sources
+from .thresholds import choose_threshold, threshold_sweep
 
 __all__ = [
 	"load_dataset",
+	"scan_dataset",
 	"transform_base",
 	"clean_clinical_outliers",
+	"CleaningReport",
+	"outlier_rule_expression",
+	"flag_duplicate_rows",
+	"flag_clinical_outliers",
+	"summarize_clinical_outliers",
+	"drop_flagged_outliers",
 	"engineer_features",
+	"build_feature_plan",
+	"collect_features",
+	"compute_features",
+	"compute_sharded_features",
+	"resolve_dataset_sources",
+	"prepare_features",
+	"feature_cache_key",
+	"load_cached_features",
+	"write_feature_cache",
+	"ingest_batch",
+	"ingest_batches",
+	"scan_feature_store",
+	"load_feature_store",
 	"split_train_test",
+	"stratified_split_indices",
+	"correlation_matrix",
+	"CovarianceAccumulator",
 	"plot_correlation_heatmap",
+	"build_correlation_figure",
 	"print_binary_distributions",
 	"calculate_permutation_importance",
+	"batched_permutation_importance",
+	"score_rows",
+	"EvaluationResult",
 	"evaluate_model",
 	"plot_confusion",
 	"plot_roc_curve",
+	"plot_precision_recall",
 	"plot_feature_importance",
+	"build_confusion_figure",
+	"build_roc_figure",
+	"build_precision_recall_figure",
+	"build_feature_importance_figure",
+	"feature_importance_values",
+	"ReportRenderer",
+	"InteractiveFigures",
+	"open_figure_output",
 	"predict_patient_risk",
+	"decision_threshold",
+	"threshold_sweep",
+	"choose_threshold",
 	"save_model",
 ]
@@ -1,27 +1,50 @@
 from __future__ import annotations
 
+import time
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import polars as pl
 import seaborn as sns
+from matplotlib.figure import Figure
 from sklearn.inspection import permutation_importance
+from sklearn.metrics import check_scoring
 from sklearn.model_selection import GridSearchCV
 
 from ..config import TrainingConfig
+from ..runtime.compute import budgeted_parallelism, get_compute_budget, record_parallel_stage
+from .correlation import correlation_matrix
+from .data_pipeline import stratified_split_indices
+from .permutation import batched_permutation_importance, supports_batched_permutation
 
-def plot_correlation_heatmap(df_features: pl.DataFrame) -> None:
-    df_corr = df_features.to_pandas().corr()
+# Campos do TrainingConfig que alteram a importancia por permutacao.
+PERMUTATION_CONFIG_FIELDS: tuple[str, ...] = (
+    "scoring",
+    "permutation_repeats",
+    "permutation_sample_size",
+    "random_state",
+)
 
-    plt.figure(figsize=(12, 8))
+def build_correlation_figure(df_corr: pl.DataFrame) -> Figure:
+    # Recebe a matriz de correlation_matrix (n_features x n_features), nao os dados.
+    figure, ax = plt.subplots(figsize=(12, 8))
     sns.heatmap(
-        df_corr,
+        df_corr.to_pandas().set_index("feature"),
         annot=True,
         fmt=".2f",
         cmap="coolwarm",
         center=0,
+        ax=ax,
     )
-    plt.title("Correlacao entre Variaveis - Dataset Cardiovascular")
+    ax.set_title("Correlacao entre Variaveis - Dataset Cardiovascular")
+    return figure
+
+def plot_correlation_heatmap(
+    df_features: pl.DataFrame | pl.LazyFrame,
+    method: str = "pearson",
+) -> None:
+    build_correlation_figure(correlation_matrix(df_features, method))
     plt.show()
 
 def print_binary_distributions(
@@ -40,20 +63,61 @@ def calculate_permutation_importance(
     feature_names: list[str],
     config: TrainingConfig,
 ) -> pd.DataFrame:
-    result = permutation_importance(
-        grid.best_estimator_,
-        x_test,
-        y_test,
-        n_repeats=config.permutation_repeats,
-        scoring=config.scoring,
-        random_state=config.random_state,
-        n_jobs=-1,
+    budget = get_compute_budget(config)
+    estimator = grid.best_estimator_
+
+    sample_size = config.permutation_sample_size
+    subsampled = sample_size is not None and sample_size < len(y_test)
+    if subsampled:
+        _, sample = stratified_split_indices(
+            y_test, sample_size / len(y_test), config.random_state
+        )
+        x_test, y_test = x_test[np.sort(sample)], y_test[np.sort(sample)]
+
+    start = time.perf_counter()
+    with budgeted_parallelism(budget):
+        if supports_batched_permutation(estimator, config.scoring):
+            drops, busy_time = batched_permutation_importance(
+                estimator,
+                x_test,
+                y_test,
+                config.scoring,
+                config.permutation_repeats,
+                config.random_state,
+                n_jobs=budget.processes,
+            )
+        else:
+            # Scoring sem versao vetorizada: uma avaliacao completa por permutacao.
+            single_start = time.perf_counter()
+            check_scoring(estimator, scoring=config.scoring)(estimator, x_test, y_test)
+            single_pass = time.perf_counter() - single_start
+            drops = permutation_importance(
+                estimator,
+                x_test,
+                y_test,
+                n_repeats=config.permutation_repeats,
+                scoring=config.scoring,
+                random_state=config.random_state,
+                n_jobs=budget.processes,
+            ).importances
+            busy_time = single_pass * len(feature_names) * config.permutation_repeats
+    record_parallel_stage(
+        "importancia_permutacao",
+        budget,
+        wall_time=time.perf_counter() - start,
+        busy_time=busy_time,
     )
 
-    return pd.DataFrame(
+    df_perm = pd.DataFrame(
         {
             "feature": feature_names,
-            "importancia_media": result.importances_mean,
-            "desvio": result.importances_std,
+            "importancia_media": drops.mean(axis=1),
+            "desvio": drops.std(axis=1),
         }
-    ).sort_values("importancia_media", ascending=False)
+    )
+    if subsampled:
+        # Intervalo de 95% da media entre repeticoes (aproximacao normal).
+        margin = 1.96 * drops.std(axis=1, ddof=1) / np.sqrt(drops.shape[1])
+        df_perm["ic95_inferior"] = df_perm["importancia_media"] - margin
+        df_perm["ic95_superior"] = df_perm["importancia_media"] + margin
+    return df_perm.sort_values("importancia_media", ascending=False)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from ..config import TrainingConfig
+from .sources import require_dataset_sources
+
+CACHE_FORMAT_VERSION = 3
+
+# Campos do TrainingConfig que alteram o resultado de engineer_features.
+FEATURE_CONFIG_FIELDS: tuple[str, ...] = ("separator", "outlier_rules", "drop_duplicates")
+
+_SOURCES_INDEX = "sources.json"
+
+# Modulos que produzem as features em cache: editar qualquer um deles invalida
+# as entradas sem depender de alguem lembrar de subir CACHE_FORMAT_VERSION.
+_FEATURE_CODE_FILES: tuple[Path, ...] = (
+    Path(__file__).with_name("data_pipeline.py"),
+    Path(__file__).with_name("sources.py"),
+    Path(__file__).resolve().parents[1] / "config" / "config.py",
+)
+
+def hash_file(path: Path, chunk_size: int = 8 * 1024 * 1024) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def source_digest(path: Path, cache_dir: Path) -> str:
+    # O hash do conteudo e memorizado por (caminho, tamanho, mtime) para que
+    # execucoes repetidas nao precisem reler o CSV inteiro.
+    stat = path.stat()
+    index_path = cache_dir / _SOURCES_INDEX
+    stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+    source = str(path.resolve())
+
+    index: dict[str, dict[str, str]] = {}
+    if index_path.exists():
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+
+    entry = index.get(source)
+    if entry is not None and entry["stamp"] == stamp:
+        return entry["digest"]
+
+    digest = hash_file(path)
+    index[source] = {"stamp": stamp, "digest": digest}
+    atomic_write_text(index_path, json.dumps(index, indent=2))
+    return digest
+
+@functools.lru_cache(maxsize=None)
+def _code_file_digest(path: Path, stamp: str) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+def feature_code_fingerprint() -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for path in _FEATURE_CODE_FILES:
+        stat = path.stat()
+        file_digest = _code_file_digest(path, f"{stat.st_size}:{stat.st_mtime_ns}")
+        digest.update(f"{path.name}:{file_digest}".encode())
+    digest.update(f"polars={pl.__version__}".encode())
+    return digest.hexdigest()
+
+def feature_config_fingerprint(config: TrainingConfig) -> str:
+    fields = {name: repr(getattr(config, name)) for name in FEATURE_CONFIG_FIELDS}
+    return json.dumps(fields, sort_keys=True)
+
+def feature_cache_key(config: TrainingConfig) -> str:
+    if config.cache_dir is None:
+        raise ValueError("cache_dir nao configurado no TrainingConfig.")
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{CACHE_FORMAT_VERSION}".encode())
+    for source in require_dataset_sources(config.dataset_path):
+        digest.update(source_digest(source, config.cache_dir).encode())
+    digest.update(feature_config_fingerprint(config).encode())
+    digest.update(feature_code_fingerprint().encode())
+    return digest.hexdigest()
+
+def feature_cache_path(config: TrainingConfig) -> Path:
+    return config.cache_dir / f"features-{feature_cache_key(config)}.arrow"
+
+def load_cached_features(
+    config: TrainingConfig,
+) -> tuple[pl.DataFrame, dict[str, Any]] | None:
+    data_path = feature_cache_path(config)
+    meta_path = data_path.with_suffix(".json")
+    if not data_path.exists() or not meta_path.exists():
+        return None
+
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    # IPC sem compressao: o Polars mapeia o arquivo em memoria em vez de copia-lo.
+    return pl.read_ipc(data_path), meta
+
+def write_feature_cache(
+    df_features: pl.DataFrame,
+    meta: dict[str, Any],
+    config: TrainingConfig,
+) -> Path:
+    config.cache_dir.mkdir(parents=True, exist_ok=True)
+    data_path = feature_cache_path(config)
+
+    tmp_path = data_path.with_suffix(".arrow.tmp")
+    df_features.write_ipc(tmp_path, compression="uncompressed")
+    os.replace(tmp_path, data_path)
+
+    atomic_write_text(data_path.with_suffix(".json"), json.dumps(meta, indent=2))
+    return data_path
+
+def atomic_write_text(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import numpy as np
+import polars as pl
+
+CORRELATION_METHODS: tuple[str, ...] = ("pearson", "spearman")
+
+# Linhas convertidas para numpy por vez; so um lote fica materializado.
+CORRELATION_CHUNK_ROWS = 250_000
+
+class CovarianceAccumulator:
+    """
+    Medias e co-momentos acumulados lote a lote (formula de Chan et al.), sem
+    manter o conjunto inteiro em memoria.
+    """
+
+    def __init__(self, n_columns: int):
+        self.count = 0
+        self.mean = np.zeros(n_columns)
+        self.comoment = np.zeros((n_columns, n_columns))
+
+    def update(self, chunk: np.ndarray) -> None:
+        chunk = chunk[~np.isnan(chunk).any(axis=1)]
+        n_chunk = chunk.shape[0]
+        if n_chunk == 0:
+            return
+
+        chunk_mean = chunk.mean(axis=0)
+        centered = chunk - chunk_mean
+        delta = chunk_mean - self.mean
+        total = self.count + n_chunk
+        self.comoment += centered.T @ centered + np.outer(delta, delta) * (self.count * n_chunk / total)
+        self.mean += delta * (n_chunk / total)
+        self.count = total
+
+    def correlation(self) -> np.ndarray:
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = self.comoment / np.outer(std, std)
+        # Coluna constante: correlacao indefinida (NaN), como no pandas.
+        corr[std == 0, :] = np.nan
+        corr[:, std == 0] = np.nan
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return corr
+
+def _numeric_batches(frame: pl.DataFrame | pl.LazyFrame, chunk_rows: int) -> Iterator[np.ndarray]:
+    if isinstance(frame, pl.LazyFrame):
+        batches = frame.collect_batches(chunk_size=chunk_rows, engine="streaming")
+    else:
+        batches = frame.iter_slices(chunk_rows)
+    for batch in batches:
+        # Conversao por lote: o frame compacto (Int8/Float32) nunca e copiado
+        # inteiro para Float64.
+        yield batch.select(pl.all().cast(pl.Float64)).to_numpy()
+
+def correlation_matrix(
+    frame: pl.DataFrame | pl.LazyFrame,
+    method: str = "pearson",
+    chunk_rows: int = CORRELATION_CHUNK_ROWS,
+) -> pl.DataFrame:
+    """
+    Matriz de correlacao (Pearson ou Spearman) calculada em lotes.
+
+    Aceita DataFrame ou LazyFrame; no LazyFrame os lotes vem do engine de
+    streaming. Spearman e o Pearson dos postos medios, calculados pelo Polars.
+    Linhas com nulos sao ignoradas.
+    """
+    if method not in CORRELATION_METHODS:
+        methods = ", ".join(CORRELATION_METHODS)
+        raise ValueError(f"Metodo de correlacao desconhecido: {method}. Use: {methods}")
+
+    columns = frame.collect_schema().names()
+    numeric = frame
+    if method == "spearman":
+        # Postos dependem da coluna inteira; no DataFrame viram uma copia Float64.
+        numeric = frame.select(pl.all().rank("average"))
+
+    accumulator = CovarianceAccumulator(len(columns))
+    for chunk in _numeric_batches(numeric, chunk_rows):
+        accumulator.update(chunk)
+
+    corr = accumulator.correlation()
+    return pl.DataFrame({"feature": columns}).with_columns(
+        [pl.Series(name, corr[:, position]) for position, name in enumerate(columns)]
+    )
@@ -1,55 +1,333 @@
 from __future__ import annotations
 
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from typing import TypeVar
+
 import numpy as np
 import polars as pl
-from sklearn.model_selection import train_test_split
 
-from ..config import TrainingConfig
+from ..config import DATASET_SCHEMA, DEFAULT_OUTLIER_RULES, ClinicalRule, TrainingConfig
+from ..runtime.compute import (
+    ComputeBudget,
+    get_compute_budget,
+    limited_thread_env,
+    record_parallel_stage,
+)
+from ..runtime.profiling import profile_span
+from .cache import load_cached_features, write_feature_cache
+from .sources import require_dataset_sources
+
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+
+PIPELINE_MODES: tuple[str, ...] = ("eager", "lazy", "streaming")
+
+# Campos do TrainingConfig que alteram a divisao treino/teste.
+SPLIT_CONFIG_FIELDS: tuple[str, ...] = ("test_size", "random_state")
+
+_FIRST_ROW_FLAG = "__primeira_ocorrencia"
+_ROW_HASH = "__hash_linha"
+
+
+@dataclass(frozen=True)
+class CleaningReport:
+    registros: int
+    mantidos: int
+    rejeitados_por_regra: dict[str, int]
+    duplicadas: int
+
+    @property
+    def removidos(self) -> int:
+        return self.registros - self.mantidos
+
+    @classmethod
+    def from_frame(cls, df_report: pl.DataFrame, mantidos: int) -> CleaningReport:
+        counts = df_report.row(0, named=True)
+        registros = int(counts.pop("registros"))
+        duplicadas = int(counts.pop("duplicadas"))
+        return cls(
+            registros=registros,
+            mantidos=mantidos,
+            rejeitados_por_regra={name: int(value) for name, value in counts.items()},
+            duplicadas=duplicadas,
+        )
+
+    @classmethod
+    def combine(cls, reports: list[CleaningReport]) -> CleaningReport:
+        rejeitados: dict[str, int] = {}
+        for report in reports:
+            for regra, total in report.rejeitados_por_regra.items():
+                rejeitados[regra] = rejeitados.get(regra, 0) + total
+
+        return cls(
+            registros=sum(report.registros for report in reports),
+            mantidos=sum(report.mantidos for report in reports),
+            rejeitados_por_regra=rejeitados,
+            duplicadas=sum(report.duplicadas for report in reports),
+        )
+
 
 def load_dataset(config: TrainingConfig) -> pl.DataFrame:
-    return pl.read_csv(config.dataset_path, separator=config.separator)
+    sources = require_dataset_sources(config.dataset_path)
+    if len(sources) > 1:
+        return scan_dataset(config).collect()
+
+    return pl.read_csv(
+        sources[0],
+        separator=config.separator,
+        schema_overrides=DATASET_SCHEMA,
+    )
+
+def scan_dataset(config: TrainingConfig) -> pl.LazyFrame:
+    return pl.scan_csv(
+        require_dataset_sources(config.dataset_path),
+        separator=config.separator,
+        schema_overrides=DATASET_SCHEMA,
+    )
 
-def transform_base(df_inicial: pl.DataFrame) -> pl.DataFrame:
+def transform_base(df_inicial: FrameT) -> FrameT:
     return (
-        df_inicial.with_columns((pl.col("age") / 365.25).cast(pl.Int32).alias("age_years"))
+        df_inicial.with_columns((pl.col("age") / 365.25).cast(pl.Int16).alias("age_years"))
         .rename({"cardio": "peak_risk"})
         .drop(["id", "age"])
     )
 
-def clean_clinical_outliers(df: pl.DataFrame) -> pl.DataFrame:
-    return df.filter(
-        (pl.col("ap_hi") >= 60)
-        & (pl.col("ap_hi") <= 250)
-        & (pl.col("ap_lo") >= 40)
-        & (pl.col("ap_lo") <= 200)
-        & (pl.col("ap_hi") > pl.col("ap_lo"))
-        & (pl.col("height") >= 140)
-        & (pl.col("height") <= 220)
-        & (pl.col("weight") >= 30)
-        & (pl.col("weight") <= 200)
+def outlier_rule_expression(rule: ClinicalRule) -> pl.Expr:
+    column = pl.col(rule.column)
+    conditions: list[pl.Expr] = []
+    if rule.min_value is not None:
+        conditions.append(column >= rule.min_value)
+    if rule.max_value is not None:
+        conditions.append(column <= rule.max_value)
+    if rule.greater_than is not None:
+        conditions.append(column > pl.col(rule.greater_than))
+
+    if not conditions:
+        raise ValueError(f"Regra clinica sem condicoes: {rule.name}")
+    return pl.all_horizontal(conditions).alias(_rule_flag(rule))
+
+def flag_duplicate_rows(df_inicial: FrameT, ignore: tuple[str, ...] = ("id",)) -> FrameT:
+    # Nos shards o hash ja vem calculado para a deduplicacao entre arquivos.
+    if _ROW_HASH in df_inicial.collect_schema().names():
+        row_hash = pl.col(_ROW_HASH)
+    else:
+        row_hash = _row_hash_expression(df_inicial, ignore)
+    return df_inicial.with_columns(row_hash.is_first_distinct().alias(_FIRST_ROW_FLAG))
+
+def flag_clinical_outliers(
+    df: FrameT,
+    rules: tuple[ClinicalRule, ...] = DEFAULT_OUTLIER_RULES,
+) -> FrameT:
+    return df.with_columns([outlier_rule_expression(rule) for rule in rules])
+
+def summarize_clinical_outliers(
+    df_flagged: FrameT,
+    rules: tuple[ClinicalRule, ...] = DEFAULT_OUTLIER_RULES,
+) -> FrameT:
+    return df_flagged.select(
+        [pl.len().alias("registros")]
+        + [(~pl.col(_rule_flag(rule))).sum().alias(rule.name) for rule in rules]
+        + [(~pl.col(_FIRST_ROW_FLAG)).sum().alias("duplicadas")]
     )
 
-def engineer_features(df_limpo: pl.DataFrame) -> pl.DataFrame:
+def drop_flagged_outliers(
+    df_flagged: FrameT,
+    rules: tuple[ClinicalRule, ...] = DEFAULT_OUTLIER_RULES,
+    drop_duplicates: bool = False,
+) -> FrameT:
+    flags = [_rule_flag(rule) for rule in rules]
+    keep = flags + [_FIRST_ROW_FLAG] if drop_duplicates else flags
+    return df_flagged.filter(pl.all_horizontal(keep)).drop(flags + [_FIRST_ROW_FLAG])
+
+def clean_clinical_outliers(
+    df: FrameT,
+    rules: tuple[ClinicalRule, ...] = DEFAULT_OUTLIER_RULES,
+) -> FrameT:
+    return df.filter(pl.all_horizontal([outlier_rule_expression(rule) for rule in rules]))
+
+def engineer_features(df_limpo: FrameT) -> FrameT:
     return df_limpo.with_columns(
         [
-            (pl.col("weight") / ((pl.col("height") / 100) ** 2)).round(2).alias("imc"),
+            (pl.col("weight") / ((pl.col("height").cast(pl.Float32) / 100) ** 2))
+            .round(2)
+            .alias("imc"),
             (pl.col("ap_hi") - pl.col("ap_lo")).alias("pulse_pressure"),
         ]
     )
 
+def build_feature_plan(
+    df_inicial: FrameT,
+    config: TrainingConfig,
+) -> tuple[FrameT, FrameT]:
+    df_base = transform_base(flag_duplicate_rows(df_inicial))
+    df_flagged = flag_clinical_outliers(df_base, config.outlier_rules)
+    df_report = summarize_clinical_outliers(df_flagged, config.outlier_rules)
+    df_limpo = drop_flagged_outliers(df_flagged, config.outlier_rules, config.drop_duplicates)
+    return engineer_features(df_limpo), df_report
+
+def collect_features(config: TrainingConfig) -> tuple[pl.DataFrame, CleaningReport]:
+    if config.pipeline_mode not in ("lazy", "streaming"):
+        raise ValueError(
+            f"pipeline_mode invalido para execucao lazy: {config.pipeline_mode}. "
+            "Use 'lazy' ou 'streaming'."
+        )
+
+    lf_features, lf_report = build_feature_plan(scan_dataset(config), config)
+    engine = "streaming" if config.pipeline_mode == "streaming" else "auto"
+    # Leitura e limpeza sao um unico plano: nao ha como medi-las separadamente.
+    with profile_span("leitura_limpeza_lazy"):
+        df_features, df_report = pl.collect_all([lf_features, lf_report], engine=engine)
+    return df_features, CleaningReport.from_frame(df_report, df_features.shape[0])
+
+def prepare_features(config: TrainingConfig) -> tuple[pl.DataFrame, CleaningReport]:
+    if config.cache_dir is None:
+        return compute_features(config)
+
+    with profile_span("leitura_cache_features"):
+        cached = load_cached_features(config)
+    if cached is not None:
+        df_features, report = cached
+        return df_features, CleaningReport(**report)
+
+    df_features, report = compute_features(config)
+    write_feature_cache(df_features, asdict(report), config)
+    return df_features, report
+
+def compute_features(config: TrainingConfig) -> tuple[pl.DataFrame, CleaningReport]:
+    if config.pipeline_mode not in PIPELINE_MODES:
+        modes = ", ".join(PIPELINE_MODES)
+        raise ValueError(f"pipeline_mode desconhecido: {config.pipeline_mode}. Use: {modes}")
+
+    if config.pipeline_mode != "eager":
+        return collect_features(config)
+
+    sources = require_dataset_sources(config.dataset_path)
+    if len(sources) > 1:
+        return compute_sharded_features(config)
+
+    with profile_span("leitura_csv"):
+        df_inicial = load_dataset(config)
+    with profile_span("limpeza_features"):
+        df_features, df_report = build_feature_plan(df_inicial, config)
+    return df_features, CleaningReport.from_frame(df_report, df_features.shape[0])
+
+def compute_sharded_features(config: TrainingConfig) -> tuple[pl.DataFrame, CleaningReport]:
+    # Um processo por shard: cada arquivo passa pelas etapas completas e os
+    # DataFrames voltam serializados em Arrow, sem passar por pandas. Cada shard
+    # devolve tambem o hash das suas linhas: duplicatas em arquivos diferentes
+    # sao contadas (e removidas) como na leitura de um arquivo so.
+    shard_configs = [
+        replace(config, dataset_path=shard, pipeline_mode="eager")
+        for shard in require_dataset_sources(config.dataset_path)
+    ]
+    budget = get_compute_budget(config)
+    workers = min(config.shard_workers or budget.processes, len(shard_configs))
+
+    start = time.perf_counter()
+    with limited_thread_env(budget.threads_per_process), ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        results = list(executor.map(_compute_shard_features, shard_configs))
+    record_parallel_stage(
+        "preprocessamento_shards",
+        ComputeBudget(processes=workers, threads_per_process=budget.threads_per_process),
+        wall_time=time.perf_counter() - start,
+        busy_time=sum(elapsed for _, _, _, elapsed in results),
+    )
+
+    df_features = pl.concat([df_shard for df_shard, _, _, _ in results], rechunk=True)
+    if config.drop_duplicates:
+        df_features = df_features.filter(pl.col(_ROW_HASH).is_first_distinct())
+    df_features = df_features.drop(_ROW_HASH)
+
+    # Cada shard ja contou as suas duplicatas internas; faltam as linhas cuja
+    # primeira ocorrencia esta em um shard anterior.
+    shard_hashes = [hashes for _, _, hashes, _ in results]
+    across_shards = sum(len(hashes) for hashes in shard_hashes) - pl.concat(shard_hashes).n_unique()
+    report = CleaningReport.combine([report for _, report, _, _ in results])
+    return df_features, replace(
+        report,
+        mantidos=df_features.shape[0],
+        duplicadas=report.duplicadas + across_shards,
+    )
+
+def _compute_shard_features(
+    config: TrainingConfig,
+) -> tuple[pl.DataFrame, CleaningReport, pl.Series, float]:
+    start = time.perf_counter()
+    df_inicial = load_dataset(config)
+    df_inicial = df_inicial.with_columns(_row_hash_expression(df_inicial).alias(_ROW_HASH))
+    df_features, df_report = build_feature_plan(df_inicial, config)
+    report = CleaningReport.from_frame(df_report, df_features.shape[0])
+    return df_features, report, df_inicial[_ROW_HASH].unique(), time.perf_counter() - start
+
+def _row_hash_expression(df_inicial: FrameT, ignore: tuple[str, ...] = ("id",)) -> pl.Expr:
+    # Linhas identicas sao detectadas pelo hash da linha inteira (exceto o id).
+    columns = [
+        name for name in df_inicial.collect_schema().names() if name not in ignore and name != _ROW_HASH
+    ]
+    return pl.struct(columns).hash()
+
+def _rule_flag(rule: ClinicalRule) -> str:
+    return f"__regra_{rule.name}"
+
+def stratified_split_indices(
+    y: np.ndarray,
+    test_size: float,
+    random_state: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    if not 0.0 < test_size < 1.0:
+        raise ValueError(f"test_size deve estar entre 0 e 1: {test_size}")
+
+    rng = np.random.default_rng(random_state)
+    n_samples = y.shape[0]
+    n_test = int(np.ceil(test_size * n_samples))
+
+    _, y_codes, class_counts = np.unique(y, return_inverse=True, return_counts=True)
+    if class_counts.min() < 2:
+        raise ValueError("Cada classe precisa de ao menos 2 amostras para estratificar.")
+
+    # Distribui n_test entre as classes pela maior parte fracionaria (metodo de Hamilton).
+    quotas = class_counts * (n_test / n_samples)
+    test_counts = np.floor(quotas).astype(np.int64)
+    remainder = n_test - int(test_counts.sum())
+    test_counts[np.argsort(test_counts - quotas, kind="stable")[:remainder]] += 1
+
+    permutation = rng.permutation(n_samples)
+    by_class = permutation[np.argsort(y_codes[permutation], kind="stable")]
+    class_starts = np.concatenate(([0], np.cumsum(class_counts)[:-1]))
+
+    test_mask = np.zeros(n_samples, dtype=bool)
+    for start, count in zip(class_starts, test_counts):
+        test_mask[by_class[start : start + count]] = True
+
+    train_idx = permutation[~test_mask[permutation]]
+    test_idx = permutation[test_mask[permutation]]
+    return train_idx, test_idx
+
 def split_train_test(
     df_features: pl.DataFrame,
     config: TrainingConfig,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[str]]:
-    x = df_features.drop("peak_risk").to_numpy()
-    y = df_features["peak_risk"].to_numpy()
+    feature_names = [name for name in df_features.columns if name != "peak_risk"]
+    y_all = df_features["peak_risk"].to_numpy()
 
-    x_train, x_test, y_train, y_test = train_test_split(
-        x,
-        y,
+    train_idx, test_idx = stratified_split_indices(
+        y_all,
         test_size=config.test_size,
         random_state=config.random_state,
-        stratify=y,
     )
-    feature_names = list(df_features.drop("peak_risk").columns)
-    return x_train, x_test, y_train, y_test, feature_names
+    order = np.concatenate((train_idx, test_idx))
+    n_train = train_idx.shape[0]
+
+    # Uma unica matriz float32 contigua, ja na ordem treino|teste: os conjuntos
+    # de treino e teste sao views dela, sem copias intermediarias por fatia.
+    x = np.empty((order.shape[0], len(feature_names)), dtype=np.float32)
+    for j, name in enumerate(feature_names):
+        x[:, j] = df_features[name].to_numpy()[order]
+    y = y_all[order]
+
+    return x[:n_train], x[n_train:], y[:n_train], y[n_train:], feature_names
@@ -1,71 +1,228 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from functools import cached_property
+
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
 from sklearn.metrics import (
     ConfusionMatrixDisplay,
-    accuracy_score,
+    auc as curve_auc,
+    average_precision_score,
     classification_report,
-    confusion_matrix,
-    roc_auc_score,
+    precision_recall_curve,
     roc_curve,
 )
 from sklearn.model_selection import GridSearchCV
 
+from .metrics import bootstrap_metrics, confusion_counts, score_rows
+
+CLASS_LABELS: tuple[str, str] = ("Sem risco", "Com risco")
+
+CALIBRATION_BINS = 10
+
+@dataclass(frozen=True)
+class EvaluationResult:
+    """
+    Avaliacao no conjunto de teste derivada de uma unica chamada a predict_proba.
+
+    Labels, metricas, curvas e tabela de calibracao sao calculados sob demanda a
+    partir de ``y_proba`` e ficam em cache no proprio objeto.
+    """
+
+    y_true: np.ndarray
+    y_proba: np.ndarray
+    threshold: float = 0.5
+
+    @cached_property
+    def y_pred(self) -> np.ndarray:
+        return (self.y_proba >= self.threshold).astype(self.y_true.dtype)
+
+    @cached_property
+    def confusion(self) -> np.ndarray:
+        tp, fp, fn, tn = confusion_counts(self.y_true, self.y_pred)
+        return np.array([[tn, fp], [fn, tp]])
+
+    @property
+    def accuracy(self) -> float:
+        return float(np.trace(self.confusion) / self.confusion.sum())
+
+    def score(self, scoring: str) -> float:
+        return float(score_rows(scoring, self.y_true, y_pred=self.y_pred, y_score=self.y_proba)[0])
+
+    def confidence_intervals(
+        self,
+        n_replicates: int = 2000,
+        confidence: float = 0.95,
+        random_state: int | None = None,
+    ) -> pd.DataFrame:
+        distributions = bootstrap_metrics(
+            self.y_true, self.y_proba, self.y_pred, n_replicates, random_state
+        )
+        alpha = (1.0 - confidence) / 2
+        return pd.DataFrame(
+            [
+                {
+                    "metrica": name,
+                    "estimativa": self.auc if name == "roc_auc" else self.score(name),
+                    "ic_inferior": float(np.quantile(values, alpha)),
+                    "ic_superior": float(np.quantile(values, 1.0 - alpha)),
+                }
+                for name, values in distributions.items()
+            ]
+        )
+
+    @cached_property
+    def report(self) -> str:
+        return classification_report(self.y_true, self.y_pred, target_names=list(CLASS_LABELS))
+
+    @cached_property
+    def roc(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return roc_curve(self.y_true, self.y_proba)
+
+    @cached_property
+    def auc(self) -> float:
+        fpr, tpr, _ = self.roc
+        return float(curve_auc(fpr, tpr))
+
+    @cached_property
+    def precision_recall(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return precision_recall_curve(self.y_true, self.y_proba)
+
+    @cached_property
+    def average_precision(self) -> float:
+        return float(average_precision_score(self.y_true, self.y_proba))
+
+    @cached_property
+    def calibration(self) -> pd.DataFrame:
+        edges = np.linspace(0.0, 1.0, CALIBRATION_BINS + 1)
+        bins = np.clip(np.searchsorted(edges, self.y_proba, side="right") - 1, 0, CALIBRATION_BINS - 1)
+        counts = np.bincount(bins, minlength=CALIBRATION_BINS)
+        proba_sum = np.bincount(bins, weights=self.y_proba, minlength=CALIBRATION_BINS)
+        positive_sum = np.bincount(bins, weights=self.y_true, minlength=CALIBRATION_BINS)
+        filled = counts > 0
+        return pd.DataFrame(
+            {
+                "faixa": [f"{low:.1f}-{high:.1f}" for low, high in zip(edges[:-1], edges[1:])],
+                "amostras": counts,
+                "prob_media": np.where(filled, proba_sum / np.maximum(counts, 1), np.nan),
+                "taxa_observada": np.where(filled, positive_sum / np.maximum(counts, 1), np.nan),
+            }
+        )[filled].reset_index(drop=True)
+
 def evaluate_model(
     grid: GridSearchCV,
     x_test: np.ndarray,
     y_test: np.ndarray,
-) -> tuple[float, str, np.ndarray, np.ndarray]:
-    y_pred = grid.predict(x_test)
+    threshold: float = 0.5,
+) -> EvaluationResult:
     y_proba = grid.predict_proba(x_test)[:, 1]
+    return EvaluationResult(y_true=np.asarray(y_test), y_proba=y_proba, threshold=threshold)
 
-    accuracy = float(accuracy_score(y_test, y_pred))
-    report = classification_report(
-        y_test,
-        y_pred,
-        target_names=["Sem risco", "Com risco"],
-    )
-    return accuracy, report, y_pred, y_proba
-
-def plot_confusion(y_test: np.ndarray, y_pred: np.ndarray) -> None:
-    cm = confusion_matrix(y_test, y_pred)
+def build_confusion_figure(confusion: np.ndarray) -> Figure:
+    figure, ax = plt.subplots()
     disp = ConfusionMatrixDisplay(
-        confusion_matrix=cm,
-        display_labels=["Sem risco", "Com risco"],
+        confusion_matrix=confusion,
+        display_labels=list(CLASS_LABELS),
     )
-    disp.plot(cmap="Blues")
-    plt.title("Matriz de Confusao - Modelo de Risco Cardiaco")
-    plt.show()
+    disp.plot(ax=ax, cmap="Blues")
+    ax.set_title("Matriz de Confusao - Modelo de Risco Cardiaco")
+    return figure
 
-def plot_roc_curve(y_test: np.ndarray, y_proba: np.ndarray) -> float:
-    fpr, tpr, _ = roc_curve(y_test, y_proba)
-    auc = float(roc_auc_score(y_test, y_proba))
-
-    plt.figure(figsize=(8, 6))
-    plt.plot(fpr, tpr, color="steelblue", lw=2, label=f"Gradient Boosting (AUC = {auc:.3f})")
-    plt.plot([0, 1], [0, 1], color="gray", linestyle="--", label="Modelo Aleatorio")
-    plt.xlabel("Taxa de Falsos Positivos")
-    plt.ylabel("Taxa de Verdadeiros Positivos (Recall)")
-    plt.title("Curva ROC - Modelo de Risco Cardiaco")
-    plt.legend()
-    plt.show()
-    return auc
+def build_roc_figure(fpr: np.ndarray, tpr: np.ndarray, auc: float) -> Figure:
+    figure, ax = plt.subplots(figsize=(8, 6))
+    ax.plot(fpr, tpr, color="steelblue", lw=2, label=f"Gradient Boosting (AUC = {auc:.3f})")
+    ax.plot([0, 1], [0, 1], color="gray", linestyle="--", label="Modelo Aleatorio")
+    ax.set_xlabel("Taxa de Falsos Positivos")
+    ax.set_ylabel("Taxa de Verdadeiros Positivos (Recall)")
+    ax.set_title("Curva ROC - Modelo de Risco Cardiaco")
+    ax.legend()
+    return figure
 
-def plot_feature_importance(grid: GridSearchCV, feature_names: list[str]) -> None:
+def build_precision_recall_figure(
+    precision: np.ndarray,
+    recall: np.ndarray,
+    average_precision: float,
+    prevalence: float,
+) -> Figure:
+    figure, ax = plt.subplots(figsize=(8, 6))
+    ax.plot(
+        recall,
+        precision,
+        color="steelblue",
+        lw=2,
+        label=f"Gradient Boosting (AP = {average_precision:.3f})",
+    )
+    ax.axhline(prevalence, color="gray", linestyle="--", label="Prevalencia")
+    ax.set_xlabel("Recall")
+    ax.set_ylabel("Precisao")
+    ax.set_title("Curva Precisao-Recall - Modelo de Risco Cardiaco")
+    ax.legend()
+    return figure
+
+def feature_importance_values(
+    grid: GridSearchCV,
+    feature_names: list[str],
+    df_perm: pd.DataFrame | None = None,
+) -> tuple[np.ndarray, str]:
     trained_model = grid.best_estimator_.named_steps["model"]
-    importances = trained_model.feature_importances_
+    if hasattr(trained_model, "feature_importances_"):
+        return trained_model.feature_importances_, "Importancia Relativa"
+    if df_perm is not None:
+        # HistGradientBoosting nao expoe feature_importances_: usa a importancia por permutacao.
+        importances = (
+            df_perm.set_index("feature").loc[feature_names, "importancia_media"].to_numpy()
+        )
+        return importances, "Importancia por Permutacao"
+    raise ValueError(
+        "Modelo sem feature_importances_; informe df_perm com a importancia por permutacao."
+    )
+
+def build_feature_importance_figure(
+    feature_names: list[str],
+    importances: np.ndarray,
+    ylabel: str,
+) -> Figure:
     sorted_indices = importances.argsort()[::-1]
 
-    plt.figure(figsize=(10, 6))
-    plt.bar(range(len(feature_names)), importances[sorted_indices], color="steelblue")
-    plt.xticks(
+    figure, ax = plt.subplots(figsize=(10, 6))
+    ax.bar(range(len(feature_names)), importances[sorted_indices], color="steelblue")
+    ax.set_xticks(
         range(len(feature_names)),
         [feature_names[i] for i in sorted_indices],
         rotation=45,
         ha="right",
     )
-    plt.title("Importancia das Features - Gradient Boosting")
-    plt.ylabel("Importancia Relativa")
-    plt.tight_layout()
+    ax.set_title("Importancia das Features - Gradient Boosting")
+    ax.set_ylabel(ylabel)
+    figure.tight_layout()
+    return figure
+
+def plot_confusion(evaluation: EvaluationResult) -> None:
+    build_confusion_figure(evaluation.confusion)
+    plt.show()
+
+def plot_roc_curve(evaluation: EvaluationResult) -> float:
+    fpr, tpr, _ = evaluation.roc
+    build_roc_figure(fpr, tpr, evaluation.auc)
+    plt.show()
+    return evaluation.auc
+
+def plot_precision_recall(evaluation: EvaluationResult) -> float:
+    precision, recall, _ = evaluation.precision_recall
+    build_precision_recall_figure(
+        precision, recall, evaluation.average_precision, float(evaluation.y_true.mean())
+    )
+    plt.show()
+    return evaluation.average_precision
+
+def plot_feature_importance(
+    grid: GridSearchCV,
+    feature_names: list[str],
+    df_perm: pd.DataFrame | None = None,
+) -> None:
+    importances, ylabel = feature_importance_values(grid, feature_names, df_perm)
+    build_feature_importance_figure(feature_names, importances, ylabel)
     plt.show()
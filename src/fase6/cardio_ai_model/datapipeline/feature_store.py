@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from ..config import TrainingConfig
+from .cache import atomic_write_text, feature_config_fingerprint
+from .data_pipeline import CleaningReport, compute_features
+
+STORE_FORMAT_VERSION = 2
+
+_MANIFEST = "manifest.json"
+
+# Bytes lidos no inicio e no fim do trecho ja ingerido para validar a marca d'agua.
+_WATERMARK_PROBE = 64 * 1024
+_COPY_CHUNK = 8 * 1024 * 1024
+
+def feature_store_path(config: TrainingConfig) -> Path:
+    if config.feature_store_dir is None:
+        raise ValueError("feature_store_dir nao configurado no TrainingConfig.")
+
+    # Regras de limpeza diferentes geram features diferentes: cada configuracao
+    # tem o seu proprio conjunto de particoes.
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f"v{STORE_FORMAT_VERSION}".encode())
+    digest.update(feature_config_fingerprint(config).encode())
+    return config.feature_store_dir / digest.hexdigest()
+
+def _read_manifest(store_path: Path) -> dict[str, Any]:
+    manifest_path = store_path / _MANIFEST
+    if not manifest_path.exists():
+        return {"version": STORE_FORMAT_VERSION, "partitions": [], "sources": {}}
+    return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+def _range_digest(path: Path, start: int, end: int) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as file:
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0 and (chunk := file.read(min(_COPY_CHUNK, remaining))):
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+def _watermark(path: Path, offset: int) -> dict[str, Any]:
+    # Inicio e fim do trecho ja ingerido: detectam um arquivo reescrito sem
+    # reler todo o historico a cada lote.
+    return {
+        "offset": offset,
+        "head": _range_digest(path, 0, min(offset, _WATERMARK_PROBE)),
+        "tail": _range_digest(path, max(0, offset - _WATERMARK_PROBE), offset),
+    }
+
+def _watermark_matches(path: Path, watermark: dict[str, Any], size: int) -> bool:
+    return size >= watermark["offset"] and _watermark(path, watermark["offset"]) == watermark
+
+def _complete_rows_end(path: Path, size: int) -> int:
+    # Byte seguinte ao ultimo "\n": uma linha sem quebra pode estar sendo escrita
+    # e fica para o proximo lote.
+    with path.open("rb") as file:
+        end = size
+        while end > 0:
+            start = max(0, end - _WATERMARK_PROBE)
+            file.seek(start)
+            newline = file.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+def _copy_new_rows(batch_path: Path, offset: int, end: int, target: Path) -> str:
+    # Cabecalho + linhas de offset ate end; devolve o hash do trecho copiado.
+    digest = hashlib.blake2b(digest_size=16)
+    with batch_path.open("rb") as source, target.open("wb") as output:
+        if offset > 0:
+            output.write(source.readline())
+            source.seek(offset)
+        remaining = end - offset
+        while remaining > 0 and (chunk := source.read(min(_COPY_CHUNK, remaining))):
+            digest.update(chunk)
+            output.write(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+def _drop_source_partitions(store_path: Path, manifest: dict[str, Any], source: str) -> None:
+    kept = []
+    for partition in manifest["partitions"]:
+        if partition["source"] == source:
+            (store_path / partition["file"]).unlink(missing_ok=True)
+        else:
+            kept.append(partition)
+    manifest["partitions"] = kept
+    manifest["sources"].pop(source, None)
+
+def ingest_batch(batch_path: Path, config: TrainingConfig) -> CleaningReport | None:
+    """
+    Ingere as linhas de ``batch_path`` ainda nao vistas pelo feature store.
+
+    Cada fonte tem uma marca d'agua (offset em bytes) no manifesto: linhas
+    acrescentadas ao final do CSV passam pelo pipeline sozinhas e viram uma
+    nova particao. Uma ultima linha sem quebra ainda pode estar sendo escrita e
+    so entra no lote seguinte. Se o trecho ja ingerido mudou (arquivo reescrito
+    ou truncado), as particoes da fonte sao descartadas e o arquivo e
+    reprocessado. Retorna None quando nao ha linhas novas.
+    """
+    store_path = feature_store_path(config)
+    store_path.mkdir(parents=True, exist_ok=True)
+
+    source = str(batch_path.resolve())
+    size = batch_path.stat().st_size
+    manifest = _read_manifest(store_path)
+    watermark = manifest["sources"].get(source)
+    if watermark is not None and not _watermark_matches(batch_path, watermark, size):
+        _drop_source_partitions(store_path, manifest, source)
+        watermark = None
+
+    offset = watermark["offset"] if watermark is not None else 0
+    end = _complete_rows_end(batch_path, size)
+    if end <= offset:
+        return None
+
+    tmp_csv = store_path / f"novas-linhas-{os.getpid()}.csv.tmp"
+    try:
+        digest = _copy_new_rows(batch_path, offset, end, tmp_csv)
+        df_features, report = compute_features(replace(config, dataset_path=tmp_csv))
+    finally:
+        tmp_csv.unlink(missing_ok=True)
+
+    # O nome inclui fonte e offset: trechos iguais de arquivos diferentes nao colidem.
+    partition_id = hashlib.blake2b(f"{source}:{offset}:{digest}".encode(), digest_size=16)
+    partition_file = f"part-{partition_id.hexdigest()}.arrow"
+    tmp_path = store_path / f"{partition_file}.tmp"
+    df_features.write_ipc(tmp_path, compression="uncompressed")
+    os.replace(tmp_path, store_path / partition_file)
+
+    manifest["partitions"].append(
+        {
+            "digest": digest,
+            "file": partition_file,
+            "source": source,
+            "offset_start": offset,
+            "offset_end": end,
+            "ingested_at": datetime.now(timezone.utc).isoformat(),
+            "report": asdict(report),
+        }
+    )
+    manifest["sources"][source] = _watermark(batch_path, end)
+    atomic_write_text(store_path / _MANIFEST, json.dumps(manifest, indent=2))
+    return report
+
+def ingest_batches(
+    batch_paths: list[Path],
+    config: TrainingConfig,
+) -> list[CleaningReport]:
+    reports = []
+    for batch_path in batch_paths:
+        report = ingest_batch(batch_path, config)
+        if report is not None:
+            reports.append(report)
+    return reports
+
+def scan_feature_store(config: TrainingConfig) -> pl.LazyFrame:
+    store_path = feature_store_path(config)
+    partitions = _read_manifest(store_path)["partitions"]
+    if not partitions:
+        raise FileNotFoundError(f"Feature store vazio: {store_path}")
+    return pl.scan_ipc([store_path / partition["file"] for partition in partitions])
+
+def load_feature_store(config: TrainingConfig) -> tuple[pl.DataFrame, CleaningReport]:
+    store_path = feature_store_path(config)
+    reports = [
+        CleaningReport(**partition["report"])
+        for partition in _read_manifest(store_path)["partitions"]
+    ]
+    return scan_feature_store(config).collect(), CleaningReport.combine(reports)
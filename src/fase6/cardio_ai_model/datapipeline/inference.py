@@ -5,11 +5,21 @@ from collections.abc import Mapping
 import numpy as np
 from sklearn.model_selection import GridSearchCV
 
+DEFAULT_THRESHOLD = 0.5
+
+def decision_threshold(model) -> float:
+    # Limiar escolhido no treino e salvo junto do modelo (decision_threshold_);
+    # artefatos antigos usam 0.5.
+    return float(getattr(model, "decision_threshold_", DEFAULT_THRESHOLD))
+
+def risk_label(probability: float, threshold: float) -> str:
+    return "ALTO RISCO" if probability >= threshold else "BAIXO RISCO"
+
 def predict_patient_risk(
     grid: GridSearchCV,
     patient: Mapping[str, float | int],
     feature_names: list[str],
-    threshold: float = 0.5,
+    threshold: float | None = None,
 ) -> tuple[float, str]:
     missing = [name for name in feature_names if name not in patient]
     if missing:
@@ -18,5 +28,6 @@ def predict_patient_risk(
 
     x_patient = np.array([[float(patient[name]) for name in feature_names]])
     probability = float(grid.predict_proba(x_patient)[0][1])
-    label = "ALTO RISCO" if probability >= threshold else "BAIXO RISCO"
-    return probability, label
+    if threshold is None:
+        threshold = decision_threshold(grid)
+    return probability, risk_label(probability, threshold)
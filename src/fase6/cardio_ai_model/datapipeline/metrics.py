@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import numpy as np
+from scipy.stats import rankdata
+
+# Metricas binarias calculadas de uma vez para varias predicoes: cada linha de
+# uma matriz (k, n) e uma predicao completa do conjunto avaliado.
+VECTORIZED_SCORINGS: tuple[str, ...] = (
+    "accuracy",
+    "balanced_accuracy",
+    "f1",
+    "precision",
+    "recall",
+    "roc_auc",
+)
+
+def confusion_counts(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    positives = y_true.astype(bool)
+    predicted = y_pred.astype(bool)
+    tp = (predicted & positives).sum(axis=-1)
+    fp = (predicted & ~positives).sum(axis=-1)
+    fn = (~predicted & positives).sum(axis=-1)
+    tn = (~predicted & ~positives).sum(axis=-1)
+    return tp, fp, fn, tn
+
+def safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # Mesmo comportamento do sklearn (zero_division=0) para divisao por zero.
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+def roc_auc_rows(y_true: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    # AUC = estatistica U de Mann-Whitney; postos medios tratam empates.
+    scores = np.atleast_2d(scores)
+    positives = y_true.astype(bool)
+    n_pos = positives.sum()
+    n_neg = positives.size - n_pos
+    if n_pos == 0 or n_neg == 0:
+        raise ValueError("roc_auc exige as duas classes no conjunto avaliado.")
+
+    ranks = rankdata(scores, axis=1)
+    rank_sum = ranks[:, positives].sum(axis=1)
+    return (rank_sum - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+def score_rows(
+    scoring: str,
+    y_true: np.ndarray,
+    y_pred: np.ndarray | None = None,
+    y_score: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Calcula ``scoring`` para cada linha de ``y_pred`` (labels 0/1) ou de
+    ``y_score`` (probabilidade da classe positiva, usada por roc_auc).
+    """
+    if scoring not in VECTORIZED_SCORINGS:
+        supported = ", ".join(VECTORIZED_SCORINGS)
+        raise ValueError(f"scoring sem versao vetorizada: {scoring}. Use: {supported}")
+
+    if scoring == "roc_auc":
+        return roc_auc_rows(y_true, y_score)
+
+    tp, fp, fn, tn = confusion_counts(y_true, np.atleast_2d(y_pred))
+    if scoring == "accuracy":
+        return safe_divide(tp + tn, tp + fp + fn + tn)
+    if scoring == "precision":
+        return safe_divide(tp, tp + fp)
+    if scoring == "recall":
+        return safe_divide(tp, tp + fn)
+    if scoring == "balanced_accuracy":
+        return (safe_divide(tp, tp + fn) + safe_divide(tn, tn + fp)) / 2
+    return safe_divide(2 * tp, 2 * tp + fp + fn)
+
+BOOTSTRAP_METRICS: tuple[str, ...] = ("roc_auc", "f1", "precision", "recall", "accuracy")
+
+# Limite de elementos da matriz (replicas x amostras) processada por vez.
+_BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000
+
+def _resample_weights(rng: np.random.Generator, n_replicates: int, n_samples: int) -> np.ndarray:
+    # Matriz de indices reamostrados -> quantas vezes cada amostra aparece em
+    # cada replica, com um unico bincount sobre (replica, indice).
+    indices = rng.integers(0, n_samples, size=(n_replicates, n_samples))
+    offsets = np.arange(n_replicates)[:, None] * n_samples
+    counts = np.bincount((indices + offsets).ravel(), minlength=n_replicates * n_samples)
+    return counts.reshape(n_replicates, n_samples).astype(np.float64)
+
+def _weighted_auc(
+    weights: np.ndarray,
+    positives_sorted: np.ndarray,
+    group_starts: np.ndarray,
+) -> np.ndarray:
+    # Pesos somados por grupo de scores iguais (ja ordenados): a AUC e a soma,
+    # para cada grupo, dos positivos x negativos abaixo + metade dos empatados.
+    positive_weights = np.add.reduceat(weights * positives_sorted, group_starts, axis=1)
+    negative_weights = np.add.reduceat(weights * ~positives_sorted, group_starts, axis=1)
+    negatives_below = np.cumsum(negative_weights, axis=1) - negative_weights
+    pairs = (positive_weights * (negatives_below + negative_weights / 2)).sum(axis=1)
+    total = positive_weights.sum(axis=1) * negative_weights.sum(axis=1)
+    return safe_divide(pairs, total)
+
+def bootstrap_metrics(
+    y_true: np.ndarray,
+    y_score: np.ndarray,
+    y_pred: np.ndarray,
+    n_replicates: int = 2000,
+    random_state: int | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Distribuicao bootstrap de AUC, F1, precisao, recall e acuracia.
+
+    Cada replica e uma linha de uma matriz de pesos (contagem de cada amostra
+    reamostrada); as contagens da matriz de confusao saem de produtos
+    matriz-vetor e a AUC de somas acumuladas sobre os scores ordenados uma vez.
+    """
+    positives = y_true.astype(bool)
+    predicted = y_pred.astype(bool)
+    n_samples = positives.size
+
+    order = np.argsort(y_score, kind="stable")
+    sorted_scores = y_score[order]
+    positives_sorted = positives[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+
+    outcomes = np.stack(
+        [
+            predicted & positives,
+            predicted & ~positives,
+            ~predicted & positives,
+            ~predicted & ~positives,
+        ],
+        axis=1,
+    ).astype(np.float64)
+
+    rng = np.random.default_rng(random_state)
+    chunk = max(1, _BOOTSTRAP_CHUNK_ELEMENTS // n_samples)
+    distributions: dict[str, list[np.ndarray]] = {name: [] for name in BOOTSTRAP_METRICS}
+    for first in range(0, n_replicates, chunk):
+        weights = _resample_weights(rng, min(chunk, n_replicates - first), n_samples)
+        tp, fp, fn, tn = (weights @ outcomes).T
+        distributions["roc_auc"].append(_weighted_auc(weights[:, order], positives_sorted, group_starts))
+        distributions["f1"].append(safe_divide(2 * tp, 2 * tp + fp + fn))
+        distributions["precision"].append(safe_divide(tp, tp + fp))
+        distributions["recall"].append(safe_divide(tp, tp + fn))
+        distributions["accuracy"].append(safe_divide(tp + tn, tp + fp + fn + tn))
+
+    return {name: np.concatenate(values) for name, values in distributions.items()}
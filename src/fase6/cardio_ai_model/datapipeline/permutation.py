@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from .metrics import VECTORIZED_SCORINGS, score_rows
+
+# Linhas por chamada de predict_proba ao avaliar as copias permutadas em lote.
+PERMUTATION_BATCH_ROWS = 500_000
+
+def supports_batched_permutation(estimator, scoring: str) -> bool:
+    return scoring in VECTORIZED_SCORINGS and len(getattr(estimator, "classes_", ())) == 2
+
+def _supports_tree_deltas(estimator) -> bool:
+    # Transformadores coluna a coluna comutam com a permutacao de uma coluna:
+    # permutar a entrada ou a saida do scaler da o mesmo resultado.
+    if not isinstance(estimator, Pipeline):
+        return False
+    model = estimator[-1]
+    prefix_ok = all(
+        step in ("passthrough", None) or isinstance(step, StandardScaler)
+        for _, step in estimator.steps[:-1]
+    )
+    return (
+        prefix_ok
+        and isinstance(model, GradientBoostingClassifier)
+        and model.estimators_.shape[1] == 1
+    )
+
+def _permutation_batches(n_rows: int, n_repeats: int, seed: int, batch_rows: int) -> Iterator[np.ndarray]:
+    # Permutacoes geradas lote a lote: no maximo batch_rows linhas (ao menos uma
+    # repeticao) ficam materializadas por tarefa.
+    rng = np.random.default_rng(seed)
+    per_batch = max(1, batch_rows // n_rows)
+    for first in range(0, n_repeats, per_batch):
+        count = min(per_batch, n_repeats - first)
+        yield np.stack([rng.permutation(n_rows) for _ in range(count)])
+
+def _permuted_copies(x: np.ndarray, column: int, permutations: np.ndarray) -> np.ndarray:
+    n_rows = x.shape[0]
+    stacked = np.tile(x, (len(permutations), 1))
+    for position, permutation in enumerate(permutations):
+        stacked[position * n_rows : (position + 1) * n_rows, column] = x[permutation, column]
+    return stacked
+
+def _tree_values(tree, x: np.ndarray) -> np.ndarray:
+    return tree.predict(x).reshape(x.shape[0], -1)[:, 0]
+
+def _proba_feature_scores(
+    estimator,
+    x: np.ndarray,
+    y_positive: np.ndarray,
+    scoring: str,
+    column: int,
+    n_repeats: int,
+    seed: int,
+    batch_rows: int,
+) -> tuple[np.ndarray, float]:
+    start = time.perf_counter()
+    n_rows = x.shape[0]
+    scores = []
+    for batch in _permutation_batches(n_rows, n_repeats, seed, batch_rows):
+        proba = estimator.predict_proba(_permuted_copies(x, column, batch))
+        positive = proba[:, 1].reshape(len(batch), n_rows)
+        # Mesmo criterio do predict (argmax, empate para a classe 0).
+        predicted = positive > proba[:, 0].reshape(len(batch), n_rows)
+        scores.append(score_rows(scoring, y_positive, y_pred=predicted, y_score=positive))
+    return np.concatenate(scores), time.perf_counter() - start
+
+def _tree_delta_feature_scores(
+    model: GradientBoostingClassifier,
+    xt: np.ndarray,
+    raw: np.ndarray,
+    trees: list[int],
+    y_positive: np.ndarray,
+    scoring: str,
+    column: int,
+    n_repeats: int,
+    seed: int,
+    batch_rows: int,
+) -> tuple[np.ndarray, float]:
+    # A margem do ensemble e a soma das arvores: so as arvores que usam a coluna
+    # permutada mudam de saida, as demais ficam como na margem base. A saida
+    # base de cada arvore e recalculada por lote em vez de guardada para todas.
+    start = time.perf_counter()
+    n_rows = xt.shape[0]
+    scores = []
+    for batch in _permutation_batches(n_rows, n_repeats, seed, batch_rows):
+        stacked = _permuted_copies(xt, column, batch)
+        margin = np.repeat(raw[None, :], len(batch), axis=0)
+        for tree_index in trees:
+            tree = model.estimators_[tree_index, 0].tree_
+            delta = _tree_values(tree, stacked).reshape(len(batch), n_rows)
+            delta -= _tree_values(tree, xt)
+            delta *= model.learning_rate
+            margin += delta
+        # Com perda logistica, proba positiva > negativa equivale a margem > 0.
+        scores.append(score_rows(scoring, y_positive, y_pred=margin > 0, y_score=margin))
+    return np.concatenate(scores), time.perf_counter() - start
+
+def batched_permutation_importance(
+    estimator,
+    x: np.ndarray,
+    y: np.ndarray,
+    scoring: str,
+    n_repeats: int,
+    random_state: int,
+    n_jobs: int = 1,
+    batch_rows: int = PERMUTATION_BATCH_ROWS,
+) -> tuple[np.ndarray, float]:
+    """
+    Importancia por permutacao avaliando as repeticoes de cada feature em lote.
+
+    Para Pipelines ``StandardScaler -> GradientBoostingClassifier`` so as arvores
+    que usam a feature permutada sao reavaliadas; nos demais casos, as
+    repeticoes de uma feature vao juntas em predict_proba. Nos dois caminhos
+    cada lote tem no maximo ``batch_rows`` linhas (ao menos uma repeticao).
+    Retorna a matriz (n_features, n_repeats) de quedas de score e o tempo
+    ocupado somado.
+    """
+    start = time.perf_counter()
+    y_positive = y == estimator.classes_[1]
+    n_rows, n_features = x.shape
+    seeds = np.random.default_rng(random_state).integers(2**63, size=n_features)
+
+    if _supports_tree_deltas(estimator):
+        model = estimator[-1]
+        xt = np.ascontiguousarray(estimator[:-1].transform(x), dtype=np.float32)
+        raw = model.decision_function(xt).astype(np.float64)
+        trees_by_feature: list[list[int]] = [[] for _ in range(n_features)]
+        for tree_index, tree in enumerate(model.estimators_[:, 0]):
+            for column in np.unique(tree.tree_.feature[tree.tree_.feature >= 0]):
+                trees_by_feature[column].append(tree_index)
+        baseline = score_rows(scoring, y_positive, y_pred=raw[None, :] > 0, y_score=raw[None, :])
+        tasks = (
+            delayed(_tree_delta_feature_scores)(
+                model,
+                xt,
+                raw,
+                trees_by_feature[column],
+                y_positive,
+                scoring,
+                column,
+                n_repeats,
+                seed,
+                batch_rows,
+            )
+            for column, seed in enumerate(seeds)
+        )
+    else:
+        proba = estimator.predict_proba(x)
+        baseline = score_rows(
+            scoring,
+            y_positive,
+            y_pred=(proba[:, 1] > proba[:, 0])[None, :],
+            y_score=proba[None, :, 1],
+        )
+        tasks = (
+            delayed(_proba_feature_scores)(
+                estimator, x, y_positive, scoring, column, n_repeats, seed, batch_rows
+            )
+            for column, seed in enumerate(seeds)
+        )
+    busy_time = time.perf_counter() - start
+
+    results = Parallel(n_jobs=n_jobs)(tasks)
+    scores = np.stack([feature_scores for feature_scores, _ in results])
+    busy_time += sum(feature_time for _, feature_time in results)
+    return baseline[0] - scores, busy_time
@@ -1,10 +1,26 @@
 from __future__ import annotations
 
+import copy
 from pathlib import Path
 
 import joblib
 from sklearn.model_selection import GridSearchCV
 
+from ..runtime.profiling import profile_span
+
+def _without_transformer_cache(grid: GridSearchCV) -> GridSearchCV:
+    # O cache de transformadores aponta para um diretorio da maquina de treino;
+    # o artefato leva copias sem ele e o grid em uso nao e alterado.
+    artifact = copy.copy(grid)
+    for name in ("estimator", "best_estimator_"):
+        pipeline = getattr(artifact, name, None)
+        if getattr(pipeline, "memory", None) is not None:
+            pipeline = copy.copy(pipeline)
+            pipeline.memory = None
+            setattr(artifact, name, pipeline)
+    return artifact
+
 def save_model(grid: GridSearchCV, output_path: Path) -> None:
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(grid, output_path)
+    with profile_span("joblib_dump"):
+        joblib.dump(_without_transformer_cache(grid), output_path)
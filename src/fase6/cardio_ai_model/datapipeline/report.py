@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import html
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from ..config import TrainingConfig
+from ..runtime.profiling import profile_span
+
+REPORT_FORMATS: tuple[str, ...] = ("png", "svg")
+REPORT_TITLE = "Relatorio - Modelo de Risco Cardiaco"
+REPORT_DPI = 120
+
+FigureBuilder = Callable[..., Figure]
+
+
+def report_dir_for(model_output_path: Path) -> Path:
+    # Relatorio ao lado do artefato: modelo_risco_cardiaco.pkl -> modelo_risco_cardiaco_relatorio/
+    return model_output_path.with_name(f"{model_output_path.stem}_relatorio")
+
+
+def _use_agg() -> None:
+    # Workers sem display: o backend precisa ser definido antes do primeiro plot.
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+
+
+def _render_figure(
+    builder: FigureBuilder,
+    args: tuple[Any, ...],
+    base_path: Path,
+    formats: tuple[str, ...],
+) -> list[Path]:
+    figure = builder(*args)
+    paths = []
+    for fmt in formats:
+        path = base_path.with_suffix(f".{fmt}")
+        figure.savefig(path, format=fmt, dpi=REPORT_DPI, bbox_inches="tight")
+        paths.append(path)
+    plt.close(figure)
+    return paths
+
+
+class InteractiveFigures:
+    """Modo padrao: cada figura e montada e exibida com plt.show(), sem relatorio."""
+
+    def figure(self, name: str, title: str, builder: FigureBuilder, *args: Any) -> None:
+        with profile_span(f"figura_{name}"):
+            builder(*args)
+            plt.show()
+
+    def section(self, title: str, text: str) -> None:
+        pass
+
+    def close(self) -> Path | None:
+        return None
+
+    def __enter__(self) -> InteractiveFigures:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+class ReportRenderer:
+    """
+    Renderiza as figuras com o backend Agg em um pool de processos e monta um
+    relatorio Markdown/HTML com figuras e tabelas na ordem em que foram enviadas.
+
+    ``figure`` so agenda o trabalho: o pipeline segue (treino, avaliacao)
+    enquanto os workers salvam os PNG/SVG. ``close`` espera as figuras e grava
+    ``relatorio.md`` e ``relatorio.html`` em ``output_dir``.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        formats: tuple[str, ...] = REPORT_FORMATS,
+        processes: int = 1,
+        title: str = REPORT_TITLE,
+    ):
+        if not formats:
+            raise ValueError("Informe ao menos um formato de figura para o relatorio.")
+        self.output_dir = output_dir
+        self.formats = formats
+        self.title = title
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = ProcessPoolExecutor(
+            max_workers=max(1, processes),
+            mp_context=get_context("spawn"),
+            initializer=_use_agg,
+        )
+        self._entries: list[tuple[str, str, Future[list[Path]] | str]] = []
+
+    def figure(self, name: str, title: str, builder: FigureBuilder, *args: Any) -> None:
+        future = self._executor.submit(
+            _render_figure, builder, args, self.output_dir / name, self.formats
+        )
+        self._entries.append(("figure", title, future))
+
+    def section(self, title: str, text: str) -> None:
+        self._entries.append(("section", title, text))
+
+    def close(self) -> Path:
+        with profile_span("figuras_relatorio"):
+            return self._write_report()
+
+    def _write_report(self) -> Path:
+        try:
+            blocks = []
+            for kind, title, content in self._entries:
+                if kind == "figure":
+                    paths = content.result()
+                    blocks.append((kind, title, paths[0].name))
+                else:
+                    blocks.append((kind, title, content))
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+        markdown_path = self.output_dir / "relatorio.md"
+        markdown_path.write_text(self._markdown(blocks), encoding="utf-8")
+        (self.output_dir / "relatorio.html").write_text(self._html(blocks), encoding="utf-8")
+        return markdown_path
+
+    def _markdown(self, blocks: list[tuple[str, str, str]]) -> str:
+        lines = [f"# {self.title}", ""]
+        for kind, title, content in blocks:
+            lines += [f"## {title}", ""]
+            if kind == "figure":
+                lines += [f"![{title}]({content})", ""]
+            else:
+                lines += ["```", content, "```", ""]
+        return "\n".join(lines)
+
+    def _html(self, blocks: list[tuple[str, str, str]]) -> str:
+        body = [f"<h1>{html.escape(self.title)}</h1>"]
+        for kind, title, content in blocks:
+            body.append(f"<h2>{html.escape(title)}</h2>")
+            if kind == "figure":
+                body.append(f'<img src="{html.escape(content)}" alt="{html.escape(title)}">')
+            else:
+                body.append(f"<pre>{html.escape(content)}</pre>")
+        return (
+            '<!DOCTYPE html>\n<html lang="pt-BR">\n<head>\n<meta charset="utf-8">\n'
+            f"<title>{html.escape(self.title)}</title>\n</head>\n<body>\n"
+            + "\n".join(body)
+            + "\n</body>\n</html>\n"
+        )
+
+    def __enter__(self) -> ReportRenderer:
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        # Em caso de erro no pipeline, descarta as figuras pendentes sem relatorio.
+        if exc_type is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def open_figure_output(config: TrainingConfig) -> InteractiveFigures | ReportRenderer:
+    if not config.report_mode:
+        return InteractiveFigures()
+    return ReportRenderer(
+        report_dir_for(config.model_output_path),
+        formats=config.report_formats,
+        processes=config.report_processes,
+    )
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import glob
+from pathlib import Path
+
+_GLOB_CHARS = ("*", "?", "[")
+
+def resolve_dataset_sources(dataset_path: Path) -> list[Path]:
+    if dataset_path.is_dir():
+        return sorted(dataset_path.glob("*.csv"))
+
+    if any(char in str(dataset_path) for char in _GLOB_CHARS):
+        return sorted(Path(match) for match in glob.glob(str(dataset_path)) if Path(match).is_file())
+
+    return [dataset_path] if dataset_path.exists() else []
+
+def require_dataset_sources(dataset_path: Path) -> list[Path]:
+    sources = resolve_dataset_sources(dataset_path)
+    if not sources:
+        raise FileNotFoundError(f"Nenhum arquivo CSV encontrado em: {dataset_path}")
+    return sources
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from ..config import ClinicalCosts, TrainingConfig
+from .metrics import safe_divide
+
+THRESHOLD_OBJECTIVES: tuple[str, ...] = ("fixed", "cost", "recall")
+
+# Campos do TrainingConfig que alteram o limiar escolhido.
+THRESHOLD_CONFIG_FIELDS: tuple[str, ...] = (
+    "threshold_objective",
+    "decision_threshold",
+    "threshold_costs",
+    "target_recall",
+)
+
+def threshold_sweep(
+    y_true: np.ndarray,
+    y_proba: np.ndarray,
+    costs: ClinicalCosts | None = None,
+) -> pd.DataFrame:
+    """
+    VP/FP/FN/VN para todos os limiares candidatos em uma unica passada.
+
+    Os candidatos sao as probabilidades distintas (regra ``proba >= limiar``):
+    com os scores em ordem decrescente, os positivos previstos ate cada limiar
+    sao somas acumuladas, tomadas no fim de cada grupo de valores iguais.
+    """
+    costs = costs or ClinicalCosts()
+    positives = y_true.astype(bool)
+    order = np.argsort(-y_proba, kind="stable")
+    sorted_proba = y_proba[order]
+    group_ends = np.r_[np.flatnonzero(sorted_proba[1:] != sorted_proba[:-1]), sorted_proba.size - 1]
+
+    tp = np.r_[0, np.cumsum(positives[order])[group_ends]]
+    fp = np.r_[0, np.cumsum(~positives[order])[group_ends]]
+    # Primeiro limiar acima da maior probabilidade: nenhum paciente positivo.
+    thresholds = np.r_[np.nextafter(sorted_proba[0], np.inf), sorted_proba[group_ends]]
+    fn = positives.sum() - tp
+    tn = (~positives).sum() - fp
+
+    return pd.DataFrame(
+        {
+            "limiar": thresholds,
+            "vp": tp,
+            "fp": fp,
+            "fn": fn,
+            "vn": tn,
+            "recall": safe_divide(tp, tp + fn),
+            "precisao": safe_divide(tp, tp + fp),
+            "especificidade": safe_divide(tn, tn + fp),
+            "custo": outcome_cost(tp, fp, fn, tn, costs),
+        }
+    )
+
+def outcome_cost(
+    tp: np.ndarray,
+    fp: np.ndarray,
+    fn: np.ndarray,
+    tn: np.ndarray,
+    costs: ClinicalCosts,
+) -> np.ndarray:
+    return (
+        costs.true_positive * tp
+        + costs.false_positive * fp
+        + costs.false_negative * fn
+        + costs.true_negative * tn
+    )
+
+def choose_threshold(sweep: pd.DataFrame, config: TrainingConfig) -> float:
+    objective = config.threshold_objective
+    if objective == "fixed":
+        return float(config.decision_threshold)
+
+    if objective == "cost":
+        # Empate de custo: o maior limiar (menos alarmes para o mesmo custo).
+        cost = outcome_cost(
+            sweep["vp"].to_numpy(),
+            sweep["fp"].to_numpy(),
+            sweep["fn"].to_numpy(),
+            sweep["vn"].to_numpy(),
+            config.threshold_costs,
+        )
+        return float(sweep["limiar"].to_numpy()[np.flatnonzero(cost == cost.min())[0]])
+
+    if objective == "recall":
+        reaching = sweep[sweep["recall"] >= config.target_recall]
+        if reaching.empty:
+            raise ValueError(f"Nenhum limiar atinge recall {config.target_recall}.")
+        return float(reaching["limiar"].iloc[0])
+
+    objectives = ", ".join(THRESHOLD_OBJECTIVES)
+    raise ValueError(f"threshold_objective desconhecido: {objective}. Use: {objectives}")
@@ -0,0 +1,55 @@
+from .compute import (
+    ComputeBudget,
+    ParallelStageRecord,
+    budgeted_parallelism,
+    format_parallel_report,
+    get_compute_budget,
+    limited_thread_env,
+    parallel_report,
+    record_parallel_stage,
+    reset_parallel_report,
+)
+from .profiling import (
+    PROFILE_ENV,
+    Profiler,
+    SpanRecord,
+    format_profile_report,
+    profile_span,
+    profiling,
+)
+from .stages import (
+    Stage,
+    StageCache,
+    StageRun,
+    code_fingerprint,
+    fingerprint,
+    format_stage_report,
+    run_stages,
+    stage_key,
+)
+
+__all__ = [
+    "ComputeBudget",
+    "ParallelStageRecord",
+    "budgeted_parallelism",
+    "format_parallel_report",
+    "get_compute_budget",
+    "limited_thread_env",
+    "parallel_report",
+    "record_parallel_stage",
+    "reset_parallel_report",
+    "PROFILE_ENV",
+    "Profiler",
+    "SpanRecord",
+    "format_profile_report",
+    "profile_span",
+    "profiling",
+    "Stage",
+    "StageCache",
+    "StageRun",
+    "code_fingerprint",
+    "fingerprint",
+    "format_stage_report",
+    "run_stages",
+    "stage_key",
+]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from joblib import parallel_config
+from threadpoolctl import threadpool_limits
+
+from ..config import TrainingConfig
+
+THREAD_ENV_VARS: tuple[str, ...] = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "POLARS_MAX_THREADS",
+)
+
+
+@dataclass(frozen=True)
+class ComputeBudget:
+    processes: int
+    threads_per_process: int
+
+    @property
+    def total_threads(self) -> int:
+        return self.processes * self.threads_per_process
+
+
+@dataclass(frozen=True)
+class ParallelStageRecord:
+    stage: str
+    processes: int
+    threads_per_process: int
+    wall_time: float
+    busy_time: float
+
+    @property
+    def speedup(self) -> float:
+        return self.busy_time / self.wall_time if self.wall_time > 0 else 0.0
+
+    @property
+    def efficiency(self) -> float:
+        return self.speedup / self.processes if self.processes > 0 else 0.0
+
+
+_PARALLEL_RECORDS: list[ParallelStageRecord] = []
+
+
+def get_compute_budget(config: TrainingConfig) -> ComputeBudget:
+    threads = max(1, config.threads_per_process)
+    processes = config.compute_processes or max(1, (os.cpu_count() or 1) // threads)
+    return ComputeBudget(processes=processes, threads_per_process=threads)
+
+
+@contextmanager
+def limited_thread_env(threads: int) -> Iterator[None]:
+    # Processos filhos (spawn) herdam o ambiente no momento da criacao.
+    previous = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+    os.environ.update({name: str(threads) for name in THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@contextmanager
+def budgeted_parallelism(budget: ComputeBudget) -> Iterator[None]:
+    # joblib aplica inner_max_num_threads dentro de cada worker loky; no processo
+    # principal o limite e o total de threads do orcamento.
+    with parallel_config(
+        backend="loky",
+        n_jobs=budget.processes,
+        inner_max_num_threads=budget.threads_per_process,
+    ), threadpool_limits(limits=budget.total_threads):
+        yield
+
+
+def record_parallel_stage(
+    stage: str,
+    budget: ComputeBudget,
+    wall_time: float,
+    busy_time: float,
+) -> ParallelStageRecord:
+    record = ParallelStageRecord(
+        stage=stage,
+        processes=budget.processes,
+        threads_per_process=budget.threads_per_process,
+        wall_time=wall_time,
+        busy_time=busy_time,
+    )
+    _PARALLEL_RECORDS.append(record)
+    return record
+
+
+def parallel_report() -> list[ParallelStageRecord]:
+    return list(_PARALLEL_RECORDS)
+
+
+def reset_parallel_report() -> None:
+    _PARALLEL_RECORDS.clear()
+
+
+def format_parallel_report(records: list[ParallelStageRecord]) -> str:
+    lines = [
+        f"{'Etapa':<28} {'Proc':>4} {'Thr':>4} {'Parede (s)':>11} {'Ocupado (s)':>12} {'Eficiencia':>11}"
+    ]
+    for record in records:
+        lines.append(
+            f"{record.stage:<28} {record.processes:>4} {record.threads_per_process:>4} "
+            f"{record.wall_time:>11.2f} {record.busy_time:>12.2f} {record.efficiency:>10.1%}"
+        )
+    return "\n".join(lines)
+
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from ..config import TrainingConfig
+
+# CARDIO_PROFILE=1 liga os timers e a memoria; CARDIO_PROFILE=cprofile tambem
+# grava um .prof (cProfile) por etapa de primeiro nivel.
+PROFILE_ENV = "CARDIO_PROFILE"
+
+PROFILE_SAMPLE_INTERVAL_S = 0.05
+
+_MB = 1024 * 1024
+
+# A partir do Python 3.12 so um cProfile pode estar ativo no processo.
+_CPROFILE_LOCK = threading.Lock()
+
+
+@dataclass
+class SpanRecord:
+    span_id: int
+    parent_id: int | None
+    name: str
+    depth: int
+    thread: str
+    start_s: float
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rss_start_mb: float | None = None
+    rss_end_mb: float | None = None
+    rss_peak_mb: float | None = None
+    py_start_mb: float = 0.0
+    py_alloc_mb: float = 0.0
+    py_peak_mb: float = 0.0
+    cprofile_path: str | None = None
+
+
+def _read_rss_bytes() -> int | None:
+    # /proc/self/statm: segundo campo e o RSS em paginas (Linux).
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _to_mb(value: int | None) -> float | None:
+    return None if value is None else value / _MB
+
+
+def _traced_mb() -> float:
+    return tracemalloc.get_traced_memory()[0] / _MB if tracemalloc.is_tracing() else 0.0
+
+
+def _max_rss_mb(children: bool = False) -> float | None:
+    # ``resource`` so existe em Unix; no Windows o pico de RSS fica de fora.
+    try:
+        import resource
+    except ImportError:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    # ru_maxrss vem em KB no Linux e em bytes no macOS.
+    max_rss = resource.getrusage(who).ru_maxrss
+    return max_rss / _MB if sys.platform == "darwin" else max_rss / 1024
+
+
+class Profiler:
+    """
+    Mede cada trecho aberto com ``span``: tempo de parede, CPU da thread que o
+    abriu, RSS do processo e memoria Python (tracemalloc). Uma thread amostra
+    RSS e tracemalloc a cada ``PROFILE_SAMPLE_INTERVAL_S`` para obter os picos.
+
+    Com etapas concorrentes a memoria medida e a do processo inteiro, nao so da
+    etapa. Workers em outros processos entram apenas no pico de RSS dos filhos.
+    """
+
+    def __init__(self, output_dir: Path, cprofile: bool = False, python_memory: bool = True):
+        self.output_dir = output_dir
+        self.cprofile = cprofile
+        self.python_memory = python_memory
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.spans: list[SpanRecord] = []
+        self._open: list[SpanRecord] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = False
+        self._sampler: threading.Thread | None = None
+
+    def start(self) -> None:
+        # tracemalloc deixa cada alocacao mais lenta; sem ele py_* fica em zero.
+        if self.python_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(PROFILE_SAMPLE_INTERVAL_S):
+            self._update_peaks()
+
+    def _update_peaks(self) -> None:
+        rss = _to_mb(_read_rss_bytes())
+        traced = _traced_mb()
+        with self._lock:
+            for span in self._open:
+                if rss is not None:
+                    span.rss_peak_mb = max(span.rss_peak_mb or 0.0, rss)
+                span.py_peak_mb = max(span.py_peak_mb, traced - span.py_start_mb)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[SpanRecord]:
+        stack: list[SpanRecord] = getattr(self._local, "stack", None) or []
+        self._local.stack = stack
+        record = SpanRecord(
+            span_id=-1,
+            parent_id=stack[-1].span_id if stack else None,
+            name=name,
+            depth=len(stack),
+            thread=threading.current_thread().name,
+            start_s=time.perf_counter() - self._origin,
+            rss_start_mb=_to_mb(_read_rss_bytes()),
+            py_start_mb=_traced_mb(),
+        )
+        record.rss_peak_mb = record.rss_start_mb
+        # cProfile nao aninha: so o trecho de primeiro nivel da thread.
+        profiled = self.cprofile and not stack
+
+        with self._lock:
+            record.span_id = len(self.spans)
+            self._open.append(record)
+            self.spans.append(record)
+        stack.append(record)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        profile = _start_cprofile() if profiled else None
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+                _CPROFILE_LOCK.release()
+            record.cpu_s = time.thread_time() - cpu_start
+            record.wall_s = time.perf_counter() - wall_start
+            self._update_peaks()
+            stack.pop()
+            with self._lock:
+                self._open.remove(record)
+            record.rss_end_mb = _to_mb(_read_rss_bytes())
+            record.py_alloc_mb = _traced_mb() - record.py_start_mb
+            if profile is not None:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                path = self.output_dir / f"{self.run_id}-{record.span_id:03d}-{name}.prof"
+                profile.dump_stats(path)
+                record.cprofile_path = str(path)
+
+    def trace(self) -> dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "versions": _library_versions(),
+            "rss_peak_mb": _max_rss_mb(),
+            "rss_peak_children_mb": _max_rss_mb(children=True),
+            "spans": [asdict(span) for span in self.spans],
+        }
+
+    def write_trace(self) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"trace-{self.run_id}.json"
+        path.write_text(json.dumps(self.trace(), indent=2), encoding="utf-8")
+        return path
+
+
+def _start_cprofile() -> cProfile.Profile | None:
+    # Trechos de outras threads ficam sem .prof enquanto um cProfile estiver ativo.
+    if not _CPROFILE_LOCK.acquire(blocking=False):
+        return None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Outro profiler ja ativo no processo (ex.: python -m cProfile).
+        _CPROFILE_LOCK.release()
+        return None
+    return profile
+
+
+def _library_versions() -> dict[str, str]:
+    versions = {}
+    for module_name in ("numpy", "polars", "sklearn", "joblib"):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            versions[module_name] = getattr(module, "__version__", "?")
+    return versions
+
+
+_ACTIVE: Profiler | None = None
+
+
+def profiling_requested(config: TrainingConfig) -> tuple[bool, bool]:
+    value = os.environ.get(PROFILE_ENV, "").strip().lower()
+    from_env = value not in ("", "0", "false", "no")
+    enabled = config.profile_stages or from_env
+    return enabled, enabled and (config.profile_cprofile or value == "cprofile")
+
+
+def profile_dir_for(config: TrainingConfig) -> Path:
+    return config.profile_dir or config.model_output_path.parent / "profiling"
+
+
+@contextmanager
+def profiling(config: TrainingConfig) -> Iterator[Profiler | None]:
+    """Ativa o Profiler global durante o bloco, se pedido pela config ou por CARDIO_PROFILE."""
+    global _ACTIVE
+    enabled, cprofile = profiling_requested(config)
+    if not enabled or _ACTIVE is not None:
+        yield None
+        return
+
+    profiler = Profiler(
+        profile_dir_for(config),
+        cprofile=cprofile,
+        python_memory=config.profile_python_memory,
+    )
+    profiler.start()
+    _ACTIVE = profiler
+    try:
+        yield profiler
+    finally:
+        _ACTIVE = None
+        profiler.stop()
+
+
+@contextmanager
+def profile_span(name: str) -> Iterator[None]:
+    # Sem profiler ativo o custo e uma checagem de variavel global.
+    profiler = _ACTIVE
+    if profiler is None:
+        yield
+        return
+    with profiler.span(name):
+        yield
+
+
+def format_profile_report(spans: list[SpanRecord]) -> str:
+    # Sem RSS disponivel (ex.: Windows) a coluna de pico sai do relatorio.
+    show_rss = any(span.rss_peak_mb is not None for span in spans)
+    rss_header = f" {'Pico RSS (MB)':>14}" if show_rss else ""
+    lines = [f"{'Trecho':<32} {'Parede (s)':>11} {'CPU (s)':>9}{rss_header} {'Pico Py (MB)':>13}"]
+    # Cada trecho logo abaixo do seu pai, mesmo com etapas intercaladas entre threads.
+    children: dict[int | None, list[SpanRecord]] = {}
+    for span in spans:
+        children.setdefault(span.parent_id, []).append(span)
+    ordered: list[SpanRecord] = []
+    pending = list(reversed(children.get(None, [])))
+    while pending:
+        span = pending.pop()
+        ordered.append(span)
+        pending.extend(reversed(children.get(span.span_id, [])))
+
+    for span in ordered:
+        name = f"{'  ' * span.depth}{span.name}"
+        rss_peak = ""
+        if show_rss:
+            value = f"{span.rss_peak_mb:.1f}" if span.rss_peak_mb is not None else "-"
+            rss_peak = f" {value:>14}"
+        lines.append(f"{name:<32} {span.wall_s:>11.2f} {span.cpu_s:>9.2f}{rss_peak} {span.py_peak_mb:>13.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import os
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import joblib
+import polars as pl
+
+from ..config import TrainingConfig
+from .profiling import profile_span
+
+STAGE_CACHE_VERSION = 2
+
+_PACKAGE_DIR = Path(__file__).resolve().parents[1]
+
+# Os objetos em cache sao pickles dessas bibliotecas.
+_CACHE_LIBRARIES: tuple[str, ...] = ("numpy", "polars", "sklearn", "joblib")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    Etapa do pipeline: ``func(config, *inputs)`` devolve os valores de ``outputs``
+    (um valor direto quando ha uma unica saida).
+
+    Somente os campos em ``config_fields`` entram na chave da etapa. Com
+    ``cache=True`` as saidas sao gravadas em disco pela chave; com
+    ``fingerprint_outputs=True`` a chave das saidas vem do conteudo (etapas que
+    leem dados de fora do grafo, como o CSV).
+
+    Etapas com ``uses_compute_budget=True`` usam o orcamento inteiro de
+    processos/threads (``runtime.compute``) e nunca rodam ao mesmo tempo; as
+    demais podem rodar ao lado delas.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    config_fields: tuple[str, ...] = ()
+    cache: bool = False
+    fingerprint_outputs: bool = False
+    uses_compute_budget: bool = False
+    version: int = 1
+
+
+@dataclass(frozen=True)
+class StageRun:
+    stage: str
+    key: str
+    cached: bool
+    wall_time: float
+
+
+def fingerprint(value: Any) -> str:
+    if isinstance(value, pl.DataFrame):
+        # hash_rows e paralelo no Polars; evita serializar o DataFrame inteiro.
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(value.schema).encode())
+        digest.update(value.hash_rows(seed=0).to_numpy().tobytes())
+        return digest.hexdigest()
+    return joblib.hash(value)
+
+
+@functools.lru_cache(maxsize=None)
+def _source_digest(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def code_fingerprint() -> str:
+    """Hash do codigo do pacote e das versoes das bibliotecas dos objetos em cache."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(_PACKAGE_DIR.rglob("*.py")):
+        digest.update(f"{path.relative_to(_PACKAGE_DIR)}:{_source_digest(path)}".encode())
+    for name in _CACHE_LIBRARIES:
+        module = sys.modules.get(name) or __import__(name)
+        digest.update(f"{name}={getattr(module, '__version__', '?')}".encode())
+    return digest.hexdigest()
+
+
+def _func_fingerprint(func: Callable[..., Any]) -> str:
+    # Funcoes de etapa definidas fora do pacote (ex.: main.py) entram pelo arquivo.
+    try:
+        source = inspect.getsourcefile(func)
+    except TypeError:
+        source = None
+    name = getattr(func, "__qualname__", repr(func))
+    return f"{name}:{_source_digest(Path(source).resolve())}" if source else name
+
+
+def stage_key(stage: Stage, input_keys: list[str], config: TrainingConfig) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{STAGE_CACHE_VERSION}:{stage.name}:{stage.version}".encode())
+    # Qualquer mudanca no codigo invalida o cache: um grid em pickle de uma
+    # versao anterior do treino nunca e reaproveitado.
+    digest.update(code_fingerprint().encode())
+    digest.update(_func_fingerprint(stage.func).encode())
+    for key in input_keys:
+        digest.update(key.encode())
+    for name in stage.config_fields:
+        digest.update(f"{name}={joblib.hash(getattr(config, name))}".encode())
+    return digest.hexdigest()
+
+
+class StageCache:
+    """Saidas das etapas em ``directory``, uma entrada joblib por (etapa, chave)."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def path(self, stage: Stage, key: str) -> Path:
+        return self.directory / f"{stage.name}-{key}.joblib"
+
+    def load(self, stage: Stage, key: str) -> tuple[Any, ...] | None:
+        path = self.path(stage, key)
+        if not path.exists():
+            return None
+        return joblib.load(path)
+
+    def store(self, stage: Stage, key: str, values: tuple[Any, ...]) -> None:
+        path = self.path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        joblib.dump(values, tmp_path)
+        os.replace(tmp_path, path)
+
+
+def _execute_stage(
+    stage: Stage,
+    key: str,
+    args: list[Any],
+    config: TrainingConfig,
+    cache: StageCache | None,
+) -> tuple[tuple[Any, ...], StageRun]:
+    start = time.perf_counter()
+    use_cache = cache is not None and stage.cache
+    with profile_span(stage.name):
+        values = cache.load(stage, key) if use_cache else None
+        cached = values is not None
+        if values is None:
+            result = stage.func(config, *args)
+            values = result if len(stage.outputs) > 1 else (result,)
+            if len(values) != len(stage.outputs):
+                raise ValueError(
+                    f"Etapa {stage.name} devolveu {len(values)} valores para {len(stage.outputs)} saidas."
+                )
+            if use_cache:
+                cache.store(stage, key, values)
+    return values, StageRun(stage.name, key, cached, time.perf_counter() - start)
+
+
+def _validate_stages(stages: list[Stage]) -> None:
+    producers: dict[str, str] = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(f"Saida {output} produzida por {producers[output]} e {stage.name}.")
+            producers[output] = stage.name
+    for stage in stages:
+        missing = [name for name in stage.inputs if name not in producers]
+        if missing:
+            raise ValueError(f"Etapa {stage.name} depende de entradas sem produtor: {missing}")
+
+
+def run_stages(
+    stages: list[Stage],
+    config: TrainingConfig,
+    cache: StageCache | None = None,
+    max_workers: int = 2,
+    on_complete: Callable[[str, dict[str, Any]], None] | None = None,
+) -> tuple[dict[str, Any], list[StageRun]]:
+    """
+    Executa o grafo de etapas: cada etapa entra no pool de threads assim que
+    suas entradas ficam prontas, entao etapas independentes rodam em paralelo.
+    Uma etapa que usa o orcamento de computacao espera a anterior desse tipo
+    terminar, para que duas delas nao disputem os mesmos nucleos.
+
+    A chave de uma etapa combina as chaves das entradas e os campos de config
+    declarados; a chave de cada saida deriva da chave da etapa. Assim, mudar um
+    campo so invalida a etapa que o declara e as que dependem dela.
+    ``on_complete(nome, saidas)`` e chamado na thread principal.
+    """
+    _validate_stages(stages)
+    values: dict[str, Any] = {}
+    keys: dict[str, str] = {}
+    runs: list[StageRun] = []
+    remaining = list(stages)
+    running: dict[Future, Stage] = {}
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        while remaining or running:
+            budget_busy = any(stage.uses_compute_budget for stage in running.values())
+            for stage in [s for s in remaining if all(name in values for name in s.inputs)]:
+                if stage.uses_compute_budget:
+                    if budget_busy:
+                        continue
+                    budget_busy = True
+                remaining.remove(stage)
+                key = stage_key(stage, [keys[name] for name in stage.inputs], config)
+                args = [values[name] for name in stage.inputs]
+                running[pool.submit(_execute_stage, stage, key, args, config, cache)] = stage
+            if not running:
+                names = ", ".join(stage.name for stage in remaining)
+                raise ValueError(f"Dependencia circular entre as etapas: {names}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                stage_values, run = future.result()
+                outputs = dict(zip(stage.outputs, stage_values))
+                for name, value in outputs.items():
+                    keys[name] = (
+                        fingerprint(value)
+                        if stage.fingerprint_outputs
+                        else hashlib.blake2b(f"{run.key}:{name}".encode(), digest_size=16).hexdigest()
+                    )
+                values.update(outputs)
+                runs.append(run)
+                if on_complete is not None:
+                    on_complete(stage.name, outputs)
+    except BaseException:
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    pool.shutdown(wait=True)
+    return values, runs
+
+
+def format_stage_report(runs: list[StageRun]) -> str:
+    lines = [f"{'Etapa':<28} {'Origem':>10} {'Parede (s)':>11}"]
+    for run in runs:
+        origin = "cache" if run.cached else "executada"
+        lines.append(f"{run.stage:<28} {origin:>10} {run.wall_time:>11.2f}")
+    return "\n".join(lines)
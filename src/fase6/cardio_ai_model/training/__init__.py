@@ -1,3 +1,16 @@
-from .training import train_gradient_boosting
+from .distributed import DistributedTaskGridSearchCV, SearchCoordinator, run_worker
+from .results_store import SearchResultsStore
+from .search import TaskGridSearchCV, TimeBudgetRandomizedSearchCV, inference_tradeoff_table
+from .training import build_pipeline, train_gradient_boosting
 
-__all__ = ["train_gradient_boosting"]
+__all__ = [
+    "DistributedTaskGridSearchCV",
+    "SearchCoordinator",
+    "SearchResultsStore",
+    "TaskGridSearchCV",
+    "TimeBudgetRandomizedSearchCV",
+    "build_pipeline",
+    "inference_tradeoff_table",
+    "run_worker",
+    "train_gradient_boosting",
+]
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import ipaddress
+import multiprocessing
+import os
+import queue
+import secrets
+import socket
+import threading
+import time
+import traceback
+from collections.abc import Iterator
+from multiprocessing.connection import Client, Connection, answer_challenge, deliver_challenge
+from typing import Any
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+from .search import CandidateGroup, TaskGridSearchCV, evaluate_group_on_fold
+from .shared import InMemoryFoldData
+
+AUTHKEY_ENV = "CARDIO_SEARCH_AUTHKEY"
+
+_POLL_INTERVAL_S = 0.2
+
+HANDSHAKE_TIMEOUT_S = 10.0
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def resolve_authkey(host: str, authkey: bytes | None = None) -> bytes:
+    # As mensagens sao objetos pickle: sem uma chave compartilhada qualquer
+    # cliente da rede poderia executar codigo no coordenador ou nos workers.
+    if authkey is not None:
+        return authkey
+    if os.environ.get(AUTHKEY_ENV):
+        return os.environ[AUTHKEY_ENV].encode()
+    if _is_loopback(host):
+        return secrets.token_bytes(32)
+    raise ValueError(
+        f"Defina {AUTHKEY_ENV} para aceitar workers fora desta maquina ({host})."
+    )
+
+
+def run_worker(address: tuple[str, int], authkey: bytes, threads: int = 1) -> int:
+    """
+    Processo worker: recebe os dados uma vez e executa tarefas (grupo, fold)
+    ate o coordenador mandar parar. Retorna o numero de tarefas concluidas.
+    """
+    done = 0
+    with Client(address, authkey=authkey) as connection, threadpool_limits(limits=threads):
+        try:
+            _, estimator, size_param, data, scorer, inference_cost = connection.recv()
+            while True:
+                message = connection.recv()
+                if message[0] == "stop":
+                    return done
+
+                _, task_id, group, fold = message
+                try:
+                    results = evaluate_group_on_fold(
+                        estimator, group, size_param, data, fold, scorer, inference_cost
+                    )
+                except Exception:
+                    connection.send(("error", task_id, traceback.format_exc()))
+                    continue
+                connection.send(("result", task_id, results))
+                done += 1
+        except (OSError, EOFError):
+            # Coordenador encerrou (busca concluida por outros workers).
+            return done
+
+
+class SearchCoordinator:
+    """
+    Distribui tarefas (grupo de candidatos, fold) para workers conectados via TCP.
+
+    Cada worker recebe estimador, dados e folds uma unica vez ao conectar e depois
+    uma tarefa por vez. Se a conexao cai, a tarefa em andamento volta para a fila;
+    com ``task_timeout_s``, uma tarefa lenta tambem e reenviada a outro worker e o
+    primeiro resultado que chegar e o que vale.
+
+    A autenticacao de cada conexao roda na sua propria thread e e abortada apos
+    ``handshake_timeout_s``: um cliente que conecta e nao responde nao impede
+    outros workers de entrar.
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        authkey: bytes,
+        *,
+        local_workers: int = 0,
+        threads_per_worker: int = 1,
+        task_timeout_s: float | None = None,
+        max_attempts: int = 3,
+        handshake_timeout_s: float = HANDSHAKE_TIMEOUT_S,
+        verbose: int = 0,
+    ):
+        self.authkey = authkey
+        self.local_workers = local_workers
+        self.threads_per_worker = threads_per_worker
+        self.task_timeout_s = task_timeout_s
+        self.max_attempts = max_attempts
+        self.handshake_timeout_s = handshake_timeout_s
+        self.verbose = verbose
+        self._server = socket.create_server(address)
+        self.address: tuple[str, int] = self._server.getsockname()[:2]
+        self.workers_seen = 0
+
+    def run(
+        self,
+        setup: tuple[Any, ...],
+        tasks: list[tuple[CandidateGroup, int]],
+    ) -> Iterator[list[dict[str, Any]]]:
+        self._setup = ("setup", *setup)
+        self._tasks = tasks
+        self._pending: queue.Queue[int] = queue.Queue()
+        self._results: queue.Queue[tuple[Any, ...]] = queue.Queue()
+        self._finished: set[int] = set()
+        self._attempts = [0] * len(tasks)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._done = threading.Event()
+        for task_id in range(len(tasks)):
+            self._pending.put(task_id)
+
+        threading.Thread(target=self._accept, daemon=True).start()
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(
+                target=run_worker,
+                args=(self.address, self.authkey, self.threads_per_worker),
+                daemon=True,
+            )
+            for _ in range(self.local_workers)
+        ]
+        for process in processes:
+            process.start()
+        if self.verbose > 0 and not processes:
+            host, port = self.address
+            print(f"Aguardando workers em {host}:{port} ({len(tasks)} tarefas)")
+
+        try:
+            while len(self._finished) < len(tasks):
+                try:
+                    message = self._results.get(timeout=1.0)
+                except queue.Empty:
+                    if processes and self._active == 0 and not any(p.is_alive() for p in processes):
+                        raise RuntimeError("Todos os workers locais encerraram antes do fim da busca.")
+                    continue
+
+                kind, task_id, payload = message
+                if kind == "error":
+                    raise RuntimeError(f"Falha na tarefa {task_id} de um worker:\n{payload}")
+                if kind == "abandoned":
+                    raise RuntimeError(
+                        f"Tarefa {task_id} falhou em {self.max_attempts} tentativas; busca abortada."
+                    )
+                with self._lock:
+                    if task_id in self._finished:
+                        continue
+                    self._finished.add(task_id)
+                yield payload
+        finally:
+            self._done.set()
+            self._server.close()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+    def _accept(self) -> None:
+        while not self._done.is_set():
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                # Socket fechado no fim da busca.
+                if self._done.is_set():
+                    return
+                continue
+            threading.Thread(target=self._authenticate, args=(sock,), daemon=True).start()
+
+    def _authenticate(self, sock: socket.socket) -> None:
+        # O desafio da authkey bloqueia em recv; ao estourar o prazo o socket e
+        # desligado, o que acorda a leitura com EOF.
+        connection = Connection(sock.dup().detach())
+        state_lock = threading.Lock()
+        state = {"authenticated": False, "expired": False}
+
+        def expire() -> None:
+            with state_lock:
+                if not state["authenticated"]:
+                    state["expired"] = True
+                    try:
+                        sock.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+
+        timer = threading.Timer(self.handshake_timeout_s, expire)
+        timer.daemon = True
+        timer.start()
+        try:
+            deliver_challenge(connection, self.authkey)
+            answer_challenge(connection, self.authkey)
+            with state_lock:
+                state["authenticated"] = not state["expired"]
+        except multiprocessing.AuthenticationError as error:
+            # Cliente com authkey invalida: recusa e segue aceitando workers.
+            print(f"Conexao recusada na busca distribuida: {error}")
+        except (OSError, EOFError):
+            # Cliente caiu ou ficou em silencio durante o handshake.
+            pass
+        finally:
+            timer.cancel()
+            sock.close()
+
+        if not state["authenticated"]:
+            if state["expired"]:
+                print("Conexao recusada na busca distribuida: handshake nao concluido no prazo.")
+            connection.close()
+            return
+        with self._lock:
+            self.workers_seen += 1
+        self._serve(connection)
+
+    def _next_task(self) -> int | None:
+        while not self._done.is_set():
+            try:
+                task_id = self._pending.get(timeout=_POLL_INTERVAL_S)
+            except queue.Empty:
+                continue
+            with self._lock:
+                if task_id in self._finished:
+                    continue
+                self._attempts[task_id] += 1
+                if self._attempts[task_id] > self.max_attempts:
+                    self._results.put(("abandoned", task_id, None))
+                    continue
+            return task_id
+        return None
+
+    def _serve(self, connection: Connection) -> None:
+        task_id = None
+        with self._lock:
+            self._active += 1
+        try:
+            connection.send(self._setup)
+            while (task_id := self._next_task()) is not None:
+                group, fold = self._tasks[task_id]
+                connection.send(("task", task_id, group, fold))
+                started = time.monotonic()
+                requeued = False
+                while not connection.poll(_POLL_INTERVAL_S):
+                    if self._done.is_set():
+                        return
+                    elapsed = time.monotonic() - started
+                    if self.task_timeout_s is not None and not requeued and elapsed > self.task_timeout_s:
+                        # Worker lento ou travado: outra copia da tarefa entra na fila.
+                        self._pending.put(task_id)
+                        requeued = True
+                self._results.put(connection.recv())
+                task_id = None
+            connection.send(("stop",))
+        except (OSError, EOFError):
+            # Worker caiu: a tarefa em andamento volta para a fila.
+            if task_id is not None and task_id not in self._finished:
+                self._pending.put(task_id)
+        finally:
+            with self._lock:
+                self._active -= 1
+            connection.close()
+
+
+class DistributedTaskGridSearchCV(TaskGridSearchCV):
+    """
+    TaskGridSearchCV com as tarefas executadas por workers TCP.
+
+    O coordenador escuta em ``address``; ``local_workers`` processos sao iniciados
+    nesta maquina e outros podem se conectar de qualquer host com
+    ``python -m cardio_ai_model.training.worker HOST PORTA`` e a mesma chave
+    em ``CARDIO_SEARCH_AUTHKEY``. Resultados, retomada pelo SQLite e o objeto final
+    sao os mesmos da execucao local.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        *,
+        address=("127.0.0.1", 0),
+        authkey=None,
+        local_workers=1,
+        threads_per_worker=1,
+        task_timeout_s=None,
+        max_attempts=3,
+        size_param=None,
+        warm_start=True,
+        results_store=None,
+        measure_inference_cost=False,
+        latency_budget_ms=None,
+        size_budget_bytes=None,
+        scoring=None,
+        refit=True,
+        cv=None,
+        verbose=0,
+    ):
+        super().__init__(
+            estimator,
+            param_grid,
+            size_param=size_param,
+            warm_start=warm_start,
+            results_store=results_store,
+            shared_memory=False,
+            measure_inference_cost=measure_inference_cost,
+            latency_budget_ms=latency_budget_ms,
+            size_budget_bytes=size_budget_bytes,
+            scoring=scoring,
+            n_jobs=None,
+            refit=refit,
+            cv=cv,
+            verbose=verbose,
+        )
+        self.address = address
+        self.authkey = authkey
+        self.local_workers = local_workers
+        self.threads_per_worker = threads_per_worker
+        self.task_timeout_s = task_timeout_s
+        self.max_attempts = max_attempts
+
+    def _run_tasks(
+        self,
+        pending: list[tuple[CandidateGroup, int]],
+        x: np.ndarray,
+        y: np.ndarray,
+        folds: list[tuple[np.ndarray, np.ndarray]],
+        scorer,
+    ) -> Iterator[list[dict[str, Any]]]:
+        self.n_workers_ = 0
+        if not pending:
+            return
+
+        host, port = self.address
+        coordinator = SearchCoordinator(
+            (host, port),
+            resolve_authkey(host, self.authkey),
+            local_workers=self.local_workers,
+            threads_per_worker=self.threads_per_worker,
+            task_timeout_s=self.task_timeout_s,
+            max_attempts=self.max_attempts,
+            verbose=self.verbose,
+        )
+        setup = (
+            self.estimator,
+            self.size_param,
+            InMemoryFoldData(x, y, folds),
+            scorer,
+            self.measures_inference_cost,
+        )
+        try:
+            yield from coordinator.run(setup, pending)
+        finally:
+            self.n_workers_ = coordinator.workers_seen
+
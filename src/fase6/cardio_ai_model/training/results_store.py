@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_key TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fold_results (
+    run_key TEXT NOT NULL,
+    params TEXT NOT NULL,
+    fold INTEGER NOT NULL,
+    test_score REAL NOT NULL,
+    fit_time REAL NOT NULL,
+    score_time REAL NOT NULL,
+    n_test_samples INTEGER NOT NULL,
+    finished_at TEXT NOT NULL,
+    latency_single_ms REAL,
+    latency_batch_ms REAL,
+    model_bytes INTEGER,
+    PRIMARY KEY (run_key, params, fold)
+);
+"""
+
+# Colunas adicionadas depois da primeira versao do schema; bancos antigos sao
+# migrados com ALTER TABLE ao abrir.
+_OPTIONAL_COLUMNS: dict[str, str] = {
+    "latency_single_ms": "REAL",
+    "latency_batch_ms": "REAL",
+    "model_bytes": "INTEGER",
+}
+
+def params_key(params: dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+class SearchResultsStore:
+    """
+    Resultados da busca de hiperparametros gravados por (candidato, fold).
+
+    Cada execucao e identificada por ``run_key`` (hash dos dados de treino e da
+    configuracao da busca). Os resultados sao gravados assim que cada tarefa
+    termina, permitindo retomar uma busca interrompida e comparar execucoes
+    sem treinar novamente.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+            existing = {row[1] for row in connection.execute("PRAGMA table_info(fold_results)")}
+            for column, column_type in _OPTIONAL_COLUMNS.items():
+                if column not in existing:
+                    connection.execute(f"ALTER TABLE fold_results ADD COLUMN {column} {column_type}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def register_run(self, run_key: str, description: dict[str, Any]) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO runs (run_key, created_at, description) VALUES (?, ?, ?)",
+                (
+                    run_key,
+                    datetime.now(timezone.utc).isoformat(),
+                    json.dumps(description, sort_keys=True, default=str),
+                ),
+            )
+
+    def completed(self, run_key: str) -> dict[tuple[str, int], dict[str, Any]]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT params, fold, test_score, fit_time, score_time, n_test_samples, "
+                + ", ".join(_OPTIONAL_COLUMNS)
+                + " FROM fold_results WHERE run_key = ?",
+                (run_key,),
+            ).fetchall()
+
+        completed = {}
+        for params, fold, test_score, fit_time, score_time, n_test_samples, *optional in rows:
+            result = {
+                "params": json.loads(params),
+                "fold": fold,
+                "test_scores": test_score,
+                "fit_time": fit_time,
+                "score_time": score_time,
+                "n_test_samples": n_test_samples,
+            }
+            result.update(
+                {name: value for name, value in zip(_OPTIONAL_COLUMNS, optional) if value is not None}
+            )
+            completed[(params, fold)] = result
+        return completed
+
+    def record(self, run_key: str, results: list[dict[str, Any]]) -> None:
+        finished_at = datetime.now(timezone.utc).isoformat()
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO fold_results "
+                "(run_key, params, fold, test_score, fit_time, score_time, n_test_samples, "
+                "finished_at, latency_single_ms, latency_batch_ms, model_bytes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_key,
+                        params_key(result["params"]),
+                        int(result["fold"]),
+                        float(result["test_scores"]),
+                        float(result["fit_time"]),
+                        float(result["score_time"]),
+                        int(result["n_test_samples"]),
+                        finished_at,
+                        result.get("latency_single_ms"),
+                        result.get("latency_batch_ms"),
+                        result.get("model_bytes"),
+                    )
+                    for result in results
+                ],
+            )
+
+    def summary(self) -> pd.DataFrame:
+        with self._connect() as connection:
+            return pd.read_sql_query(
+                "SELECT r.run_key, r.created_at, f.params, COUNT(*) AS folds, "
+                "AVG(f.test_score) AS mean_test_score, SUM(f.fit_time) AS total_fit_time "
+                "FROM fold_results f JOIN runs r ON r.run_key = f.run_key "
+                "GROUP BY r.run_key, f.params "
+                "ORDER BY r.created_at, mean_test_score DESC",
+                connection,
+            )
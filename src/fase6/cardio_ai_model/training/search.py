@@ -0,0 +1,472 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from joblib import effective_n_jobs
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
+from sklearn.model_selection._search import BaseSearchCV
+from sklearn.utils.parallel import Parallel, delayed
+
+from .results_store import SearchResultsStore, params_key
+from .shared import InMemoryFoldData, SharedArrays, SharedFoldData
+
+FoldData = InMemoryFoldData | SharedFoldData
+
+LATENCY_SINGLE_REPEATS = 25
+
+LATENCY_BATCH_ROWS = 1000
+
+INFERENCE_COST_FIELDS: tuple[str, ...] = ("latency_single_ms", "latency_batch_ms", "model_bytes")
+
+
+@dataclass(frozen=True)
+class CandidateGroup:
+    params: dict[str, Any]
+    sizes: tuple[int, ...]
+
+
+def group_candidates(
+    candidates: list[dict[str, Any]],
+    size_param: str | None,
+) -> list[CandidateGroup]:
+    """Agrupa candidatos que diferem apenas no tamanho do ensemble."""
+    if size_param is None:
+        return [CandidateGroup(params=dict(params), sizes=()) for params in candidates]
+
+    groups: dict[tuple, list[int]] = {}
+    shared: dict[tuple, dict[str, Any]] = {}
+    for params in candidates:
+        rest = {name: value for name, value in params.items() if name != size_param}
+        key = tuple(sorted(rest.items()))
+        shared[key] = rest
+        if size_param in params:
+            groups.setdefault(key, []).append(int(params[size_param]))
+        else:
+            groups.setdefault(key, [])
+
+    return [
+        CandidateGroup(params=shared[key], sizes=tuple(sorted(set(sizes))))
+        for key, sizes in groups.items()
+    ]
+
+
+def measure_inference_cost(model, x: np.ndarray) -> dict[str, float]:
+    """Latencia de predict_proba (1 linha e lote) e tamanho serializado do modelo."""
+    row = x[:1]
+    model.predict_proba(row)
+    timings = []
+    for _ in range(LATENCY_SINGLE_REPEATS):
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+
+    batch = x[:LATENCY_BATCH_ROWS]
+    batch_timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        batch_timings.append(time.perf_counter() - start)
+
+    return {
+        "latency_single_ms": float(np.median(timings)) * 1000,
+        "latency_batch_ms": float(np.median(batch_timings)) * 1000,
+        "model_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+
+
+def evaluate_group_on_fold(
+    estimator,
+    group: CandidateGroup,
+    size_param: str | None,
+    data: FoldData,
+    fold: int,
+    scorer,
+    inference_cost: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Ajusta um grupo de candidatos em um fold.
+
+    Com ``group.sizes`` preenchido, um unico ensemble e crescido com warm start
+    ate cada tamanho pedido e avaliado em cada etapa; o fit_time registrado e o
+    custo acumulado para chegar aquele tamanho. Com ``inference_cost``, cada
+    candidato tambem registra a latencia de predict_proba e o tamanho serializado.
+    """
+    model = clone(estimator).set_params(**group.params)
+    x_train, y_train, x_test, y_test = data.load_fold(fold)
+    n_test = len(y_test)
+
+    if not group.sizes:
+        start = time.perf_counter()
+        model.fit(x_train, y_train)
+        fit_time = time.perf_counter() - start
+        start = time.perf_counter()
+        score = scorer(model, x_test, y_test)
+        result = {
+            "params": dict(group.params),
+            "fold": fold,
+            "test_scores": score,
+            "fit_time": fit_time,
+            "score_time": time.perf_counter() - start,
+            "n_test_samples": n_test,
+        }
+        if inference_cost:
+            result.update(measure_inference_cost(model, x_test))
+        return [result]
+
+    model.set_params(model__warm_start=len(group.sizes) > 1)
+    results = []
+    fit_time = 0.0
+    for size in group.sizes:
+        model.set_params(**{size_param: size})
+        start = time.perf_counter()
+        model.fit(x_train, y_train)
+        fit_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        score = scorer(model, x_test, y_test)
+        result = {
+            "params": {**group.params, size_param: size},
+            "fold": fold,
+            "test_scores": score,
+            "fit_time": fit_time,
+            "score_time": time.perf_counter() - start,
+            "n_test_samples": n_test,
+        }
+        if inference_cost:
+            result.update(measure_inference_cost(model, x_test))
+        results.append(result)
+    return results
+
+
+def inference_tradeoff_table(search: BaseSearchCV) -> pd.DataFrame:
+    """Score de CV x custo de inferencia de cada candidato, do melhor score para o pior."""
+    results = search.cv_results_
+    table = pd.DataFrame(
+        {
+            "parametros": [
+                {name.removeprefix("model__"): value for name, value in params.items()}
+                for params in results["params"]
+            ],
+            "score_cv": results["mean_test_score"],
+            "latencia_1_linha_ms": results["mean_latency_single_ms"],
+            "latencia_lote_ms": results["mean_latency_batch_ms"],
+            "tamanho_kb": results["mean_model_bytes"] / 1024,
+            "dentro_orcamento": results["within_budget"],
+            "escolhido": np.arange(len(results["params"])) == search.best_index_,
+        }
+    )
+    return table.sort_values("score_cv", ascending=False).reset_index(drop=True)
+
+
+def describe_search(search: BaseSearchCV, cv) -> dict[str, Any]:
+    return {
+        "estimator": repr(search.estimator),
+        "param_grid": search.param_grid,
+        "cv": repr(cv),
+        "scoring": repr(search.scoring),
+        "size_param": search.size_param,
+        "warm_start": search.warm_start,
+        "inference_cost": search.measures_inference_cost,
+    }
+
+
+def search_run_key(search: BaseSearchCV, x: np.ndarray, y: np.ndarray, cv) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(x))
+    digest.update(np.ascontiguousarray(y))
+    digest.update(f"{x.dtype}{x.shape}{y.dtype}".encode())
+    digest.update(json.dumps(describe_search(search, cv), sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _expand(group: CandidateGroup, size_param: str | None) -> list[dict[str, Any]]:
+    if not group.sizes:
+        return [dict(group.params)]
+    return [{**group.params, size_param: size} for size in group.sizes]
+
+
+class TaskGridSearchCV(BaseSearchCV):
+    """
+    Grid search executado como tarefas (grupo de candidatos, fold).
+
+    Candidatos que diferem apenas em ``size_param`` (ex.: ``model__n_estimators``)
+    compartilham um unico ensemble por fold, crescido com warm start, em vez de
+    treinar cada tamanho do zero. Com ``n_jobs > 1`` e ``shared_memory=True``, a
+    matriz de treino e os indices dos folds sao publicados uma unica vez em
+    memoria compartilhada em vez de serializados para cada tarefa. O objeto
+    resultante expoe a mesma API do GridSearchCV (cv_results_, best_params_,
+    best_estimator_, predict, ...).
+
+    Com ``measure_inference_cost`` (ou algum orcamento definido), cv_results_
+    ganha a latencia media de predict_proba e o tamanho serializado de cada
+    candidato; ``latency_budget_ms`` (1 linha) e ``size_budget_bytes`` restringem
+    a escolha ao melhor score entre os candidatos dentro do orcamento.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        *,
+        size_param=None,
+        warm_start=True,
+        results_store=None,
+        shared_memory=True,
+        measure_inference_cost=False,
+        latency_budget_ms=None,
+        size_budget_bytes=None,
+        scoring=None,
+        n_jobs=None,
+        refit=True,
+        cv=None,
+        verbose=0,
+        pre_dispatch="2*n_jobs",
+    ):
+        super().__init__(
+            estimator=estimator,
+            scoring=scoring,
+            n_jobs=n_jobs,
+            refit=refit,
+            cv=cv,
+            verbose=verbose,
+            pre_dispatch=pre_dispatch,
+            return_train_score=False,
+        )
+        self.param_grid = param_grid
+        self.size_param = size_param
+        self.warm_start = warm_start
+        self.results_store = results_store
+        self.shared_memory = shared_memory
+        self.measure_inference_cost = measure_inference_cost
+        self.latency_budget_ms = latency_budget_ms
+        self.size_budget_bytes = size_budget_bytes
+
+    @property
+    def measures_inference_cost(self) -> bool:
+        return bool(
+            self.measure_inference_cost
+            or self.latency_budget_ms is not None
+            or self.size_budget_bytes is not None
+        )
+
+    def fit(self, X, y):
+        x = np.asarray(X)
+        y = np.asarray(y)
+        cv = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        folds = list(cv.split(x, y))
+        self.n_splits_ = len(folds)
+
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        candidates = list(ParameterGrid(self.param_grid))
+        groups = group_candidates(candidates, self.size_param if self.warm_start else None)
+        tasks = [(group, fold) for group in groups for fold in range(self.n_splits_)]
+
+        store = None
+        completed: dict[tuple[str, int], dict[str, Any]] = {}
+        if self.results_store is not None:
+            store = SearchResultsStore(Path(self.results_store))
+            self.run_key_ = search_run_key(self, x, y, cv)
+            store.register_run(self.run_key_, describe_search(self, cv))
+            completed = store.completed(self.run_key_)
+
+        pending = [
+            (group, fold)
+            for group, fold in tasks
+            if not all(
+                (params_key(params), fold) in completed
+                for params in _expand(group, self.size_param)
+            )
+        ]
+
+        if self.verbose > 0:
+            print(
+                f"Fitting {self.n_splits_} folds for each of {len(candidates)} candidates,"
+                f" totalling {len(candidates) * self.n_splits_} fits"
+                f" ({len(tasks)} tarefas de treino, {len(tasks) - len(pending)} ja concluidas)"
+            )
+
+        results_by_key = dict(completed)
+        self.task_busy_time_ = 0.0
+        for group_results in self._run_tasks(pending, x, y, folds, scorer):
+            # Gravado a cada tarefa concluida: uma interrupcao perde no maximo
+            # as tarefas em andamento.
+            if store is not None:
+                store.record(self.run_key_, group_results)
+            self.task_busy_time_ += group_results[-1]["fit_time"] + sum(
+                result["score_time"] for result in group_results
+            )
+            for result in group_results:
+                results_by_key[(params_key(result["params"]), result["fold"])] = result
+
+        out = []
+        for params in candidates:
+            for fold in range(self.n_splits_):
+                result = results_by_key[(params_key(params), fold)]
+                out.append(
+                    {
+                        "test_scores": result["test_scores"],
+                        "fit_time": result["fit_time"],
+                        "score_time": result["score_time"],
+                        "n_test_samples": result["n_test_samples"],
+                        "fit_error": None,
+                    }
+                )
+
+        results = self._format_results(candidates, self.n_splits_, out)
+        self.multimetric_ = False
+        self.scorer_ = scorer
+        self.cv_results_ = results
+        if self.measures_inference_cost:
+            for field in INFERENCE_COST_FIELDS:
+                values = [
+                    results_by_key[(params_key(params), fold)][field]
+                    for params in candidates
+                    for fold in range(self.n_splits_)
+                ]
+                results[f"mean_{field}"] = (
+                    np.asarray(values, dtype=float).reshape(len(candidates), self.n_splits_).mean(axis=1)
+                )
+            results["within_budget"] = self._within_budget(results)
+            self.best_index_ = self._select_within_budget(results)
+        else:
+            self.best_index_ = self._select_best_index(self.refit, "score", results)
+        self.best_score_ = results["mean_test_score"][self.best_index_]
+        self.best_params_ = results["params"][self.best_index_]
+
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            start = time.perf_counter()
+            self.best_estimator_.fit(x, y)
+            self.refit_time_ = time.perf_counter() - start
+
+        return self
+
+    def _within_budget(self, results: dict[str, Any]) -> np.ndarray:
+        within = np.ones(len(results["params"]), dtype=bool)
+        if self.latency_budget_ms is not None:
+            within &= results["mean_latency_single_ms"] <= self.latency_budget_ms
+        if self.size_budget_bytes is not None:
+            within &= results["mean_model_bytes"] <= self.size_budget_bytes
+        return within
+
+    def _select_within_budget(self, results: dict[str, Any]) -> int:
+        within = results["within_budget"]
+        if not within.any():
+            # Nenhum candidato cabe no orcamento: fica o de menor custo de inferencia.
+            print("Nenhum candidato dentro do orcamento de latencia/tamanho; usando o mais leve.")
+            cost_field = (
+                "mean_latency_single_ms"
+                if self.latency_budget_ms is not None
+                else "mean_model_bytes"
+            )
+            return int(np.argmin(results[cost_field]))
+        scores = np.where(within, results["mean_test_score"], -np.inf)
+        return int(np.argmax(scores))
+
+    def _run_tasks(
+        self,
+        pending: list[tuple[CandidateGroup, int]],
+        x: np.ndarray,
+        y: np.ndarray,
+        folds: list[tuple[np.ndarray, np.ndarray]],
+        scorer,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Executa as tarefas pendentes e entrega os resultados na ordem em que terminam."""
+        with SharedArrays() as shared:
+            # Com varios workers, x/y e os indices dos folds vao uma unica vez
+            # para memoria compartilhada e cada tarefa recebe so a referencia.
+            if self.shared_memory and effective_n_jobs(self.n_jobs) > 1 and pending:
+                data = SharedFoldData.create(shared, x, y, folds)
+            else:
+                data = InMemoryFoldData(x, y, folds)
+
+            yield from Parallel(
+                n_jobs=self.n_jobs,
+                pre_dispatch=self.pre_dispatch,
+                return_as="generator_unordered",
+            )(
+                delayed(evaluate_group_on_fold)(
+                    self.estimator,
+                    group,
+                    self.size_param,
+                    data,
+                    fold,
+                    scorer,
+                    self.measures_inference_cost,
+                )
+                for group, fold in pending
+            )
+
+
+class TimeBudgetRandomizedSearchCV(BaseSearchCV):
+    """
+    Busca aleatoria com orcamento de tempo.
+
+    Os candidatos sao sorteados como no RandomizedSearchCV e avaliados em lotes;
+    nenhum lote novo e iniciado depois que ``time_budget_s`` se esgota. O
+    resultado (cv_results_, best_estimator_, ...) segue a API do GridSearchCV.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_distributions,
+        *,
+        n_iter=10,
+        time_budget_s=None,
+        batch_size=None,
+        scoring=None,
+        n_jobs=None,
+        refit=True,
+        cv=None,
+        verbose=0,
+        pre_dispatch="2*n_jobs",
+        random_state=None,
+        error_score=np.nan,
+        return_train_score=False,
+    ):
+        super().__init__(
+            estimator=estimator,
+            scoring=scoring,
+            n_jobs=n_jobs,
+            refit=refit,
+            cv=cv,
+            verbose=verbose,
+            pre_dispatch=pre_dispatch,
+            error_score=error_score,
+            return_train_score=return_train_score,
+        )
+        self.param_distributions = param_distributions
+        self.n_iter = n_iter
+        self.time_budget_s = time_budget_s
+        self.batch_size = batch_size
+        self.random_state = random_state
+
+    def _run_search(self, evaluate_candidates):
+        candidates = list(
+            ParameterSampler(
+                self.param_distributions,
+                self.n_iter,
+                random_state=self.random_state,
+            )
+        )
+        batch_size = self.batch_size or effective_n_jobs(self.n_jobs)
+        deadline = None
+        if self.time_budget_s is not None:
+            deadline = time.perf_counter() + self.time_budget_s
+
+        for start in range(0, len(candidates), batch_size):
+            if start > 0 and deadline is not None and time.perf_counter() >= deadline:
+                break
+            evaluate_candidates(candidates[start : start + batch_size])
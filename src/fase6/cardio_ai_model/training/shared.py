@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SharedArrayRef:
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+def _attach(ref: SharedArrayRef) -> SharedMemory:
+    # Os workers herdam o resource_tracker do processo principal: o registro
+    # feito aqui e o mesmo da criacao, e a remocao fica com SharedArrays.close().
+    return SharedMemory(name=ref.name)
+
+
+class SharedArrays:
+    """Segmentos de memoria compartilhada criados (e removidos) pelo processo principal."""
+
+    def __init__(self):
+        self._segments: list[SharedMemory] = []
+
+    def share(self, array: np.ndarray) -> SharedArrayRef:
+        array = np.ascontiguousarray(array)
+        shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        self._segments.append(shm)
+        return SharedArrayRef(
+            name=shm.name,
+            shape=array.shape,
+            dtype=array.dtype.str,
+        )
+
+    def close(self) -> None:
+        for shm in self._segments:
+            shm.close()
+            shm.unlink()
+        self._segments.clear()
+
+    def __enter__(self) -> SharedArrays:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@dataclass(frozen=True)
+class InMemoryFoldData:
+    x: np.ndarray
+    y: np.ndarray
+    folds: list[tuple[np.ndarray, np.ndarray]]
+
+    def load_fold(self, fold: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        train, test = self.folds[fold]
+        return self.x[train], self.y[train], self.x[test], self.y[test]
+
+
+@dataclass(frozen=True)
+class SharedFoldData:
+    """
+    Matriz de treino, alvo e indices de todos os folds em memoria compartilhada.
+
+    Cada tarefa recebe apenas esta referencia (alguns bytes) em vez de uma copia
+    serializada dos dados. So a matriz base e compartilhada: ``load_fold`` copia
+    as linhas do fold para o worker, entao cada worker ativo ainda ocupa ate uma
+    copia do fold de treino e de teste e a memoria cresce com o numero de
+    workers. Os estimadores do scikit-learn nao treinam sobre uma view indexada.
+    """
+
+    x: SharedArrayRef
+    y: SharedArrayRef
+    indices: SharedArrayRef
+    offsets: tuple[tuple[int, int, int], ...]
+
+    @classmethod
+    def create(
+        cls,
+        shared: SharedArrays,
+        x: np.ndarray,
+        y: np.ndarray,
+        folds: list[tuple[np.ndarray, np.ndarray]],
+    ) -> SharedFoldData:
+        offsets = []
+        position = 0
+        for train, test in folds:
+            offsets.append((position, position + len(train), position + len(train) + len(test)))
+            position += len(train) + len(test)
+        indices = np.concatenate([np.concatenate(fold) for fold in folds]).astype(np.int64)
+        return cls(
+            x=shared.share(x),
+            y=shared.share(y),
+            indices=shared.share(indices),
+            offsets=tuple(offsets),
+        )
+
+    def load_fold(self, fold: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        segments = [_attach(ref) for ref in (self.x, self.y, self.indices)]
+        try:
+            x, y, indices = [
+                np.ndarray(ref.shape, dtype=np.dtype(ref.dtype), buffer=shm.buf)
+                for ref, shm in zip((self.x, self.y, self.indices), segments)
+            ]
+            start, middle, end = self.offsets[fold]
+            train, test = indices[start:middle], indices[middle:end]
+            # A indexacao copia so as linhas do fold; as views do segmento sao
+            # liberadas antes do close().
+            arrays = x[train], y[train], x[test], y[test]
+            del x, y, indices, train, test
+            return arrays
+        finally:
+            for shm in segments:
+                shm.close()
@@ -1,32 +1,248 @@
 from __future__ import annotations
 
+import functools
+import time
+from dataclasses import replace
+
 import numpy as np
-from sklearn.ensemble import GradientBoostingClassifier
-from sklearn.model_selection import GridSearchCV
+from joblib import Memory
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
+from sklearn.model_selection._search import BaseSearchCV
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 
-from ..config.config import TrainingConfig
+from ..config.config import FEATURE_NAMES, TrainingConfig
+from ..runtime.compute import budgeted_parallelism, get_compute_budget, record_parallel_stage
+from ..runtime.profiling import profile_span
+from .distributed import DistributedTaskGridSearchCV
+from .search import TaskGridSearchCV, TimeBudgetRandomizedSearchCV
+
+SEARCH_STRATEGIES: tuple[str, ...] = ("grid", "halving", "random")
+
+SEARCH_BACKENDS: tuple[str, ...] = ("local", "distributed")
+
+MODEL_ENGINES: tuple[str, ...] = ("gradient_boosting", "hist_gradient_boosting")
+
+# Campos do TrainingConfig que alteram o modelo treinado (paralelismo e backend nao).
+TRAINING_CONFIG_FIELDS: tuple[str, ...] = (
+    "model_engine",
+    "categorical_features",
+    "param_grid",
+    "hist_param_grid",
+    "cv_folds",
+    "scoring",
+    "random_state",
+    "search_strategy",
+    "warm_start_ensembles",
+    "halving_resource",
+    "halving_factor",
+    "random_search_iter",
+    "search_time_budget_s",
+    "measure_inference_cost",
+    "latency_budget_ms",
+    "model_size_budget_bytes",
+)
+
+def ensemble_size_param(config: TrainingConfig) -> str:
+    if config.model_engine == "hist_gradient_boosting":
+        return "model__max_iter"
+    return "model__n_estimators"
+
+def engine_param_grid(config: TrainingConfig) -> dict[str, list[int] | list[float]]:
+    if config.model_engine == "hist_gradient_boosting":
+        return config.hist_param_grid
+    return config.param_grid
+
+class BoundedMemory(Memory):
+    """joblib.Memory que volta a ``bytes_limit`` apos cada chamada em cache."""
+
+    def __init__(self, location=None, bytes_limit: int | None = None, **kwargs):
+        super().__init__(location=location, **kwargs)
+        self.bytes_limit = bytes_limit
+
+    def cache(self, func=None, **kwargs):
+        if func is None:
+            return functools.partial(self.cache, **kwargs)
+        cached = super().cache(func, **kwargs)
+        if self.bytes_limit is None or self.location is None:
+            return cached
+
+        @functools.wraps(func)
+        def bounded(*args, **call_kwargs):
+            result = cached(*args, **call_kwargs)
+            # Durante a busca cada fold transformado vai para o disco: o limite
+            # vale a cada ajuste, nao so no fim. Sai a entrada usada ha mais tempo.
+            self.reduce_size(bytes_limit=self.bytes_limit)
+            return result
+
+        return bounded
+
+def transformer_memory(config: TrainingConfig) -> Memory | None:
+    # Transformadores ajustados ficam em cache indexado pelo conteudo (parametros
+    # + dados do fold): cada candidato do grid paga apenas o ajuste do modelo.
+    if config.transformer_cache_dir is None:
+        return None
+    return BoundedMemory(
+        location=config.transformer_cache_dir,
+        bytes_limit=config.transformer_cache_bytes,
+        verbose=0,
+    )
+
+def build_pipeline(config: TrainingConfig, feature_names: list[str]) -> Pipeline:
+    if config.model_engine == "gradient_boosting":
+        return Pipeline(
+            [
+                ("scaler", StandardScaler()),
+                ("model", GradientBoostingClassifier(random_state=config.random_state)),
+            ],
+            memory=transformer_memory(config),
+        )
+
+    if config.model_engine == "hist_gradient_boosting":
+        # Arvores binarizadas nao dependem de escala; cholesterol/gluc entram
+        # como categoricas nativas. early_stopping desligado para que max_iter
+        # seja exatamente o tamanho do ensemble avaliado no grid.
+        categorical = [name in config.categorical_features for name in feature_names]
+        return Pipeline(
+            [
+                ("scaler", "passthrough"),
+                (
+                    "model",
+                    HistGradientBoostingClassifier(
+                        categorical_features=categorical if any(categorical) else None,
+                        early_stopping=False,
+                        random_state=config.random_state,
+                    ),
+                ),
+            ],
+            memory=transformer_memory(config),
+        )
+
+    engines = ", ".join(MODEL_ENGINES)
+    raise ValueError(f"model_engine desconhecido: {config.model_engine}. Use: {engines}")
+
+def _build_search(pipeline: Pipeline, config: TrainingConfig, n_jobs: int) -> BaseSearchCV:
+    if config.search_backend not in SEARCH_BACKENDS:
+        backends = ", ".join(SEARCH_BACKENDS)
+        raise ValueError(f"search_backend desconhecido: {config.search_backend}. Use: {backends}")
+
+    has_budget = config.latency_budget_ms is not None or config.model_size_budget_bytes is not None
+    if config.search_strategy != "grid" and (has_budget or config.measure_inference_cost):
+        raise ValueError("Custo de inferencia e orcamentos exigem search_strategy='grid'.")
+
+    if config.search_backend == "distributed":
+        if config.search_strategy != "grid":
+            raise ValueError("search_backend='distributed' suporta apenas search_strategy='grid'.")
+        local_workers = config.distributed_local_workers
+        return DistributedTaskGridSearchCV(
+            pipeline,
+            engine_param_grid(config),
+            address=config.coordinator_address,
+            local_workers=n_jobs if local_workers is None else local_workers,
+            threads_per_worker=config.threads_per_process,
+            task_timeout_s=config.distributed_task_timeout_s,
+            measure_inference_cost=config.measure_inference_cost,
+            latency_budget_ms=config.latency_budget_ms,
+            size_budget_bytes=config.model_size_budget_bytes,
+            size_param=ensemble_size_param(config),
+            warm_start=config.warm_start_ensembles,
+            results_store=config.search_store_path,
+            cv=config.cv_folds,
+            scoring=config.scoring,
+            verbose=1,
+        )
+
+    if config.search_strategy == "grid":
+        return TaskGridSearchCV(
+            pipeline,
+            engine_param_grid(config),
+            size_param=ensemble_size_param(config),
+            warm_start=config.warm_start_ensembles,
+            results_store=config.search_store_path,
+            shared_memory=config.shared_memory_search,
+            measure_inference_cost=config.measure_inference_cost,
+            latency_budget_ms=config.latency_budget_ms,
+            size_budget_bytes=config.model_size_budget_bytes,
+            cv=config.cv_folds,
+            scoring=config.scoring,
+            n_jobs=n_jobs,
+            verbose=1,
+        )
+
+    if config.search_strategy == "halving":
+        param_grid = dict(engine_param_grid(config))
+        resource_kwargs: dict[str, object] = {"resource": "n_samples"}
+        if config.halving_resource == "n_estimators":
+            # O numero de arvores deixa de ser hiperparametro e vira o orcamento.
+            size_param = ensemble_size_param(config)
+            sizes = param_grid.pop(size_param, [100, 200])
+            resource_kwargs = {
+                "resource": size_param,
+                "min_resources": int(min(sizes)),
+                "max_resources": int(max(sizes)),
+            }
+        elif config.halving_resource != "n_samples":
+            raise ValueError(
+                f"halving_resource desconhecido: {config.halving_resource}. "
+                "Use 'n_samples' ou 'n_estimators'."
+            )
+
+        return HalvingGridSearchCV(
+            pipeline,
+            param_grid,
+            factor=config.halving_factor,
+            cv=config.cv_folds,
+            scoring=config.scoring,
+            random_state=config.random_state,
+            n_jobs=n_jobs,
+            verbose=1,
+            **resource_kwargs,
+        )
+
+    if config.search_strategy == "random":
+        return TimeBudgetRandomizedSearchCV(
+            pipeline,
+            engine_param_grid(config),
+            n_iter=config.random_search_iter,
+            time_budget_s=config.search_time_budget_s,
+            cv=config.cv_folds,
+            scoring=config.scoring,
+            random_state=config.random_state,
+            n_jobs=n_jobs,
+            verbose=1,
+        )
+
+    strategies = ", ".join(SEARCH_STRATEGIES)
+    raise ValueError(
+        f"search_strategy desconhecida: {config.search_strategy}. Use: {strategies}"
+    )
 
 def train_gradient_boosting(
     x_train: np.ndarray,
     y_train: np.ndarray,
     config: TrainingConfig,
-) -> GridSearchCV:
-    pipeline = Pipeline(
-        [
-            ("scaler", StandardScaler()),
-            ("model", GradientBoostingClassifier(random_state=config.random_state)),
-        ]
-    )
+    feature_names: list[str] | None = None,
+) -> BaseSearchCV:
+    pipeline = build_pipeline(config, feature_names or FEATURE_NAMES)
+    budget = get_compute_budget(config)
+    grid = _build_search(pipeline, config, budget.processes)
 
-    grid = GridSearchCV(
-        pipeline,
-        config.param_grid,
-        cv=config.cv_folds,
-        scoring=config.scoring,
-        n_jobs=-1,
-        verbose=1,
-    )
-    grid.fit(x_train, y_train)
+    start = time.perf_counter()
+    with budgeted_parallelism(budget), profile_span("busca_hiperparametros"):
+        grid.fit(x_train, y_train)
+    wall_time = time.perf_counter() - start - getattr(grid, "refit_time_", 0.0)
+    if getattr(grid, "n_workers_", 0):
+        # Na busca distribuida o paralelismo e o numero de workers conectados.
+        budget = replace(budget, processes=grid.n_workers_)
+    record_parallel_stage("busca_hiperparametros", budget, wall_time, _search_busy_time(grid))
     return grid
+
+def _search_busy_time(grid: BaseSearchCV) -> float:
+    if hasattr(grid, "task_busy_time_"):
+        return grid.task_busy_time_
+
+    results = grid.cv_results_
+    per_split = np.asarray(results["mean_fit_time"]) + np.asarray(results["mean_score_time"])
+    return float(per_split.sum() * grid.n_splits_)
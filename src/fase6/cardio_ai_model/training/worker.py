@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import argparse
+import os
+
+from .distributed import AUTHKEY_ENV, run_worker
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker da busca de hiperparametros distribuida")
+    parser.add_argument("host")
+    parser.add_argument("port", type=int)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    authkey = os.environ.get(AUTHKEY_ENV)
+    if not authkey:
+        raise SystemExit(f"Defina {AUTHKEY_ENV} com a mesma chave do coordenador.")
+    done = run_worker((args.host, args.port), authkey.encode(), args.threads)
+    print(f"Worker encerrado apos {done} tarefas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,77 +3,328 @@
 
 from __future__ import annotations
 
+import copy
+from dataclasses import replace
 from pathlib import Path
 
 from cardio_ai_model.datapipeline.analysis import (
+        PERMUTATION_CONFIG_FIELDS,
+        build_correlation_figure,
         calculate_permutation_importance,
-        plot_correlation_heatmap,
         print_binary_distributions,
 )
 from cardio_ai_model.config.config import TrainingConfig, get_default_config
+from cardio_ai_model.datapipeline.correlation import correlation_matrix
 from cardio_ai_model.datapipeline.data_pipeline import (
-        clean_clinical_outliers,
-        engineer_features,
-        load_dataset,
+        SPLIT_CONFIG_FIELDS,
+        prepare_features,
         split_train_test,
-        transform_base,
+    )
+from cardio_ai_model.datapipeline.feature_store import ingest_batches, load_feature_store
+from cardio_ai_model.datapipeline.sources import resolve_dataset_sources
+from cardio_ai_model.datapipeline.thresholds import (
+        THRESHOLD_CONFIG_FIELDS,
+        choose_threshold,
+        threshold_sweep,
     )
 from cardio_ai_model.datapipeline.evaluation import (
+        build_confusion_figure,
+        build_feature_importance_figure,
+        build_precision_recall_figure,
+        build_roc_figure,
         evaluate_model,
-        plot_confusion,
-        plot_feature_importance,
-        plot_roc_curve,
+        feature_importance_values,
     )
 from cardio_ai_model.datapipeline.inference import predict_patient_risk
 from cardio_ai_model.datapipeline.persistence import save_model
-from cardio_ai_model.training.training import train_gradient_boosting
+from cardio_ai_model.datapipeline.report import open_figure_output
+from cardio_ai_model.runtime.compute import (
+        format_parallel_report,
+        parallel_report,
+        reset_parallel_report,
+    )
+from cardio_ai_model.runtime.profiling import format_profile_report, profiling
+from cardio_ai_model.runtime.stages import Stage, StageCache, format_stage_report, run_stages
+from cardio_ai_model.training.search import inference_tradeoff_table
+from cardio_ai_model.training.training import TRAINING_CONFIG_FIELDS, train_gradient_boosting
+
+
+def _features_stage(config: TrainingConfig):
+    if config.feature_store_dir is not None:
+        novos_lotes = ingest_batches(resolve_dataset_sources(config.dataset_path), config)
+        print(f"Lotes novos no feature store: {len(novos_lotes)}")
+        return load_feature_store(config)
+    return prepare_features(config)
+
+
+def _correlation_stage(config: TrainingConfig, df_features):
+    return correlation_matrix(df_features, config.correlation_method)
+
+
+def _split_stage(config: TrainingConfig, df_features):
+    return split_train_test(df_features, config)
+
+
+def _train_stage(config: TrainingConfig, x_train, y_train, feature_names):
+    return train_gradient_boosting(x_train, y_train, config, feature_names)
+
+
+def _evaluation_stage(config: TrainingConfig, grid, x_test, y_test):
+    return evaluate_model(grid, x_test, y_test)
+
+
+def _threshold_stage(config: TrainingConfig, evaluation):
+    sweep = threshold_sweep(evaluation.y_true, evaluation.y_proba, config.threshold_costs)
+    return choose_threshold(sweep, config)
+
+
+def _permutation_stage(config: TrainingConfig, grid, x_test, y_test, feature_names):
+    return calculate_permutation_importance(grid, x_test, y_test, feature_names, config)
+
+
+def _bootstrap_stage(config: TrainingConfig, evaluation, threshold):
+    return replace(evaluation, threshold=threshold).confidence_intervals(
+        config.bootstrap_replicates,
+        config.bootstrap_confidence,
+        config.random_state,
+    )
+
+
+def _save_stage(config: TrainingConfig, grid, threshold):
+    # Persistido no artefato: a inferencia le o limiar sem reavaliar o modelo.
+    # A etapa nao altera a entrada: outras etapas usam o mesmo grid em paralelo.
+    model = copy.copy(grid)
+    model.decision_threshold_ = threshold
+    save_model(model, config.model_output_path)
+    return model, config.model_output_path
+
+
+# Depois do treino, avaliacao/limiar/bootstrap, permutacao e gravacao do modelo
+# sao ramos independentes do grafo. As etapas que usam o orcamento de
+# computacao (runtime.compute) rodam uma de cada vez; as leves (divisao,
+# limiar, gravacao) rodam ao lado delas.
+PIPELINE_STAGES: list[Stage] = [
+    Stage(
+        "features",
+        _features_stage,
+        outputs=("df_features", "limpeza"),
+        fingerprint_outputs=True,
+        uses_compute_budget=True,
+    ),
+    Stage(
+        "correlacao",
+        _correlation_stage,
+        inputs=("df_features",),
+        outputs=("df_corr",),
+        config_fields=("correlation_method",),
+        cache=True,
+        uses_compute_budget=True,
+    ),
+    Stage(
+        "divisao_treino_teste",
+        _split_stage,
+        inputs=("df_features",),
+        outputs=("x_train", "x_test", "y_train", "y_test", "feature_names"),
+        config_fields=SPLIT_CONFIG_FIELDS,
+    ),
+    Stage(
+        "treino",
+        _train_stage,
+        inputs=("x_train", "y_train", "feature_names"),
+        outputs=("grid",),
+        config_fields=TRAINING_CONFIG_FIELDS,
+        cache=True,
+        uses_compute_budget=True,
+    ),
+    Stage(
+        "avaliacao",
+        _evaluation_stage,
+        inputs=("grid", "x_test", "y_test"),
+        outputs=("evaluation",),
+        cache=True,
+        uses_compute_budget=True,
+    ),
+    Stage(
+        "limiar",
+        _threshold_stage,
+        inputs=("evaluation",),
+        outputs=("threshold",),
+        config_fields=THRESHOLD_CONFIG_FIELDS,
+        cache=True,
+    ),
+    Stage(
+        "importancia_permutacao",
+        _permutation_stage,
+        inputs=("grid", "x_test", "y_test", "feature_names"),
+        outputs=("df_perm",),
+        config_fields=PERMUTATION_CONFIG_FIELDS,
+        cache=True,
+        uses_compute_budget=True,
+    ),
+    Stage(
+        "bootstrap",
+        _bootstrap_stage,
+        inputs=("evaluation", "threshold"),
+        outputs=("intervals",),
+        config_fields=("bootstrap_replicates", "bootstrap_confidence", "random_state"),
+        cache=True,
+        uses_compute_budget=True,
+    ),
+    Stage(
+        "gravacao_modelo",
+        _save_stage,
+        inputs=("grid", "threshold"),
+        outputs=("model", "model_path"),
+        config_fields=("model_output_path",),
+    ),
+]
 
 
 def run_pipeline(config: TrainingConfig):
-    df_inicial = load_dataset(config)
-    df_base = transform_base(df_inicial)
-    df_limpo = clean_clinical_outliers(df_base)
+    reset_parallel_report()
+    with profiling(config) as profiler:
+        # Com cProfile as etapas rodam uma de cada vez: cada uma ganha o seu .prof.
+        stage_workers = 1 if profiler is not None and profiler.cprofile else config.stage_workers
+        try:
+            with open_figure_output(config) as figures:
+                grid, feature_names = _run_pipeline(config, figures, stage_workers)
+                report_path = figures.close()
+        except BaseException:
+            if profiler is not None:
+                print(f"Trace parcial salvo em: {profiler.write_trace()}")
+            raise
+    if report_path is not None:
+        print(f"Relatorio salvo em: {report_path}")
+    if profiler is not None:
+        print("\n--- Perfil de Tempo e Memoria ---")
+        print(format_profile_report(profiler.spans))
+        print(f"Trace salvo em: {profiler.write_trace()}")
+    return grid, feature_names
 
-    print(f"Registros originais : {df_base.shape[0]}")
-    print(f"Registros apos limpeza: {df_limpo.shape[0]}")
-    print(f"Removidos: {df_base.shape[0] - df_limpo.shape[0]}")
 
-    df_features = engineer_features(df_limpo)
-    plot_correlation_heatmap(df_features)
+def _run_pipeline(config: TrainingConfig, figures, stage_workers: int):
+    def on_stage_complete(stage: str, outputs: dict) -> None:
+        if stage == "correlacao":
+            # No modo relatorio a figura e renderizada em outro processo durante o treino.
+            figures.figure(
+                "correlacao",
+                "Correlacao entre Variaveis",
+                build_correlation_figure,
+                outputs["df_corr"],
+            )
+
+    cache = StageCache(config.stage_cache_dir) if config.stage_cache_dir is not None else None
+    results, stage_runs = run_stages(
+        PIPELINE_STAGES,
+        config,
+        cache=cache,
+        max_workers=stage_workers,
+        on_complete=on_stage_complete,
+    )
+    df_features = results["df_features"]
+    limpeza = results["limpeza"]
+    x_train = results["x_train"]
+    x_test = results["x_test"]
+    feature_names = results["feature_names"]
+    grid = results["model"]
+    threshold = results["threshold"]
+    evaluation = replace(results["evaluation"], threshold=threshold)
+    df_perm = results["df_perm"]
+    intervals = results["intervals"]
+
+    print(f"Registros originais : {limpeza.registros}")
+    print(f"Registros apos limpeza: {limpeza.mantidos}")
+    print(f"Removidos: {limpeza.removidos}")
+    for regra, rejeitados in limpeza.rejeitados_por_regra.items():
+        print(f"  - {regra}: {rejeitados}")
+    print(f"Linhas duplicadas: {limpeza.duplicadas}")
 
-    x_train, x_test, y_train, y_test, feature_names = split_train_test(df_features, config)
     print(f"Treino: {x_train.shape[0]} amostras")
     print(f"Teste : {x_test.shape[0]} amostras")
 
     print_binary_distributions(df_features, config.binary_columns)
 
-    grid = train_gradient_boosting(x_train, y_train, config)
-
     print(f"Melhores parametros: {grid.best_params_}")
+    figures.section("Melhores Parametros", str(grid.best_params_))
+    if "within_budget" in grid.cv_results_:
+        tradeoff = inference_tradeoff_table(grid).to_string(index=False)
+        print("\n--- Score x Custo de Inferencia ---")
+        print(tradeoff)
+        figures.section("Score x Custo de Inferencia", tradeoff)
     print(f"Melhor F1 (CV): {grid.best_score_:.4f}")
-    print(f"Acuracia no Teste: {grid.score(x_test, y_test):.4f}")
 
-    df_perm = calculate_permutation_importance(
-        grid,
-        x_test,
-        y_test,
-        feature_names,
-        config,
-    )
+    print(f"F1 no Teste: {evaluation.score('f1'):.4f}")
+    print(f"Limiar de decisao ({config.threshold_objective}): {threshold:.4f}")
+
     print(df_perm.to_string(index=False))
+    figures.section("Importancia por Permutacao", df_perm.to_string(index=False))
 
-    accuracy, report, y_pred, y_proba = evaluate_model(grid, x_test, y_test)
-    print(f"Acuracia: {accuracy:.4f}")
+    print(f"Acuracia: {evaluation.accuracy:.4f}")
     print("\n--- Relatorio Completo ---")
-    print(report)
+    print(evaluation.report)
+    print("\n--- Calibracao ---")
+    print(evaluation.calibration.to_string(index=False))
+    figures.section("Relatorio de Classificacao", evaluation.report)
+    figures.section("Calibracao", evaluation.calibration.to_string(index=False))
+
+    figures.figure(
+        "matriz_confusao", "Matriz de Confusao", build_confusion_figure, evaluation.confusion
+    )
+    fpr, tpr, _ = evaluation.roc
+    figures.figure("curva_roc", "Curva ROC", build_roc_figure, fpr, tpr, evaluation.auc)
+    print(f"AUC: {evaluation.auc:.4f}")
+    precision, recall, _ = evaluation.precision_recall
+    figures.figure(
+        "curva_precisao_recall",
+        "Curva Precisao-Recall",
+        build_precision_recall_figure,
+        precision,
+        recall,
+        evaluation.average_precision,
+        float(evaluation.y_true.mean()),
+    )
+    print(f"Precisao media (AP): {evaluation.average_precision:.4f}")
+    figures.section(
+        "Resumo",
+        "\n".join(
+            [
+                f"Melhor F1 (CV): {grid.best_score_:.4f}",
+                f"F1 no Teste: {evaluation.score('f1'):.4f}",
+                f"Limiar de decisao ({config.threshold_objective}): {threshold:.4f}",
+                f"Acuracia: {evaluation.accuracy:.4f}",
+                f"AUC: {evaluation.auc:.4f}",
+                f"Precisao media (AP): {evaluation.average_precision:.4f}",
+            ]
+        ),
+    )
+
+    print(
+        f"\n--- Intervalos de Confianca ({config.bootstrap_confidence:.0%}, "
+        f"bootstrap com {config.bootstrap_replicates} replicas) ---"
+    )
+    print(intervals.to_string(index=False))
+    figures.section("Intervalos de Confianca", intervals.to_string(index=False))
+    importances, ylabel = feature_importance_values(grid, feature_names, df_perm)
+    figures.figure(
+        "importancia_features",
+        "Importancia das Features",
+        build_feature_importance_figure,
+        feature_names,
+        importances,
+        ylabel,
+    )
+
+    print(f"Modelo salvo em: {results['model_path']}")
 
-    plot_confusion(y_test, y_pred)
-    auc = plot_roc_curve(y_test, y_proba)
-    print(f"AUC: {auc:.4f}")
-    plot_feature_importance(grid, feature_names)
+    paralelismo = format_parallel_report(parallel_report())
+    print("\n--- Paralelismo por Etapa ---")
+    print(paralelismo)
+    figures.section("Paralelismo por Etapa", paralelismo)
 
-    save_model(grid, config.model_output_path)
-    print(f"Modelo salvo em: {config.model_output_path}")
+    etapas = format_stage_report(stage_runs)
+    print("\n--- Etapas do Pipeline ---")
+    print(etapas)
+    figures.section("Etapas do Pipeline", etapas)
 
     return grid, feature_names
 
@@ -105,7 +356,7 @@ def run_sample_prediction(grid, feature_names: list[str]) -> None:
 def main() -> None:
     config = get_default_config()
 
-    if not config.dataset_path.exists():
+    if not resolve_dataset_sources(config.dataset_path):
         dataset_suggestion = Path(__file__).resolve().parent / "dataset" / "cardio_train.csv"
         raise FileNotFoundError(
             "Dataset nao encontrado. "
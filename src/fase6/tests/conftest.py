@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Os testes importam o pacote a partir de src/fase6, sem instalacao.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
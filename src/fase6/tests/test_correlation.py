@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import polars as pl
+
+from cardio_ai_model.datapipeline.analysis import plot_correlation_heatmap
+from cardio_ai_model.datapipeline.correlation import correlation_matrix
+
+
+def _features() -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=1000)
+    return pl.DataFrame(
+        {
+            "idade": base,
+            "pressao": base * 2 + rng.normal(size=1000),
+            "fumante": (rng.random(1000) > 0.5).astype(np.int8),
+        }
+    )
+
+
+def test_correlation_matrix_matches_numpy_in_chunks():
+    df = _features()
+
+    result = correlation_matrix(df, chunk_rows=128)
+
+    expected = np.corrcoef(df.to_numpy().T.astype(np.float64))
+    np.testing.assert_allclose(result.drop("feature").to_numpy(), expected, atol=1e-12)
+
+
+def test_plot_correlation_heatmap_accepts_the_features_frame(monkeypatch):
+    monkeypatch.setattr(plt, "show", lambda: None)
+
+    plot_correlation_heatmap(_features())
+
+    ax = plt.gcf().axes[0]
+    assert [label.get_text() for label in ax.get_xticklabels()] == ["idade", "pressao", "fumante"]
+    plt.close("all")
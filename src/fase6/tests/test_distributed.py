@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client
+from pathlib import Path
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV
+
+from cardio_ai_model.training.distributed import AUTHKEY_ENV, DistributedTaskGridSearchCV, run_worker
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+PARAM_GRID = {"C": [0.01, 0.1, 1.0, 10.0]}
+TIMEOUT_S = 120
+
+
+class KillOnceClassifier(ClassifierMixin, BaseEstimator):
+    """Regressao logistica que derruba o processo no primeiro fit que cria ``kill_marker``."""
+
+    def __init__(self, C=1.0, kill_marker=None):
+        self.C = C
+        self.kill_marker = kill_marker
+
+    def fit(self, X, y):
+        if self.kill_marker is not None:
+            try:
+                os.close(os.open(self.kill_marker, os.O_CREAT | os.O_EXCL))
+            except FileExistsError:
+                pass
+            else:
+                os._exit(1)
+        self.model_ = LogisticRegression(C=self.C).fit(X, y)
+        self.classes_ = self.model_.classes_
+        return self
+
+    def predict(self, X):
+        return self.model_.predict(X)
+
+    def predict_proba(self, X):
+        return self.model_.predict_proba(X)
+
+
+def _data():
+    return make_classification(n_samples=300, n_features=6, random_state=0)
+
+
+def _free_address() -> tuple[str, int]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()
+
+
+def _fit_with_timeout(search, x, y):
+    errors = []
+
+    def fit():
+        try:
+            search.fit(x, y)
+        except BaseException as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=fit, daemon=True)
+    thread.start()
+    thread.join(TIMEOUT_S)
+    assert not thread.is_alive(), "busca distribuida nao terminou"
+    if errors:
+        raise errors[0]
+    return search
+
+
+def _assert_same_results(search, x, y):
+    reference = GridSearchCV(KillOnceClassifier(), PARAM_GRID, cv=3).fit(x, y)
+    assert search.best_params_ == reference.best_params_
+    assert search.cv_results_["params"] == reference.cv_results_["params"]
+    for name in ("mean_test_score", "std_test_score", "rank_test_score", "split0_test_score"):
+        np.testing.assert_allclose(search.cv_results_[name], reference.cv_results_[name])
+
+
+def test_local_workers_match_grid_search_and_survive_killed_worker(tmp_path):
+    x, y = _data()
+    marker = tmp_path / "worker_morto"
+    search = DistributedTaskGridSearchCV(
+        KillOnceClassifier(kill_marker=str(marker)),
+        PARAM_GRID,
+        local_workers=2,
+        cv=3,
+    )
+
+    _fit_with_timeout(search, x, y)
+
+    assert marker.exists()
+    _assert_same_results(search, x, y)
+
+
+def test_coordinator_keeps_accepting_after_bad_authkey():
+    x, y = _data()
+    address = _free_address()
+    authkey = b"chave-do-teste"
+    context = multiprocessing.get_context("spawn")
+    workers = []
+
+    def connect_bad_client_then_workers():
+        # Enquanto o coordenador nao escuta a conexao e recusada; depois a
+        # chave errada e rejeitada no handshake.
+        deadline = time.monotonic() + TIMEOUT_S
+        while time.monotonic() < deadline:
+            try:
+                Client(address, authkey=b"chave-errada").close()
+            except ConnectionRefusedError:
+                time.sleep(0.05)
+                continue
+            except multiprocessing.AuthenticationError:
+                break
+        for _ in range(2):
+            process = context.Process(target=run_worker, args=(address, authkey), daemon=True)
+            process.start()
+            workers.append(process)
+
+    helper = threading.Thread(target=connect_bad_client_then_workers, daemon=True)
+    helper.start()
+    search = DistributedTaskGridSearchCV(
+        KillOnceClassifier(),
+        PARAM_GRID,
+        address=address,
+        authkey=authkey,
+        local_workers=0,
+        cv=3,
+    )
+    try:
+        _fit_with_timeout(search, x, y)
+    finally:
+        helper.join(5)
+        for process in workers:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+
+    _assert_same_results(search, x, y)
+
+
+
+def test_silent_client_does_not_block_other_workers():
+    x, y = _data()
+    address = _free_address()
+    authkey = b"chave-do-teste"
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    silent = []
+
+    def connect_silent_client_then_workers():
+        # Conexao TCP que nunca responde ao desafio da authkey (ex.: port scan).
+        deadline = time.monotonic() + TIMEOUT_S
+        while time.monotonic() < deadline:
+            try:
+                silent.append(socket.create_connection(address, timeout=1))
+                break
+            except OSError:
+                time.sleep(0.05)
+        for _ in range(2):
+            process = context.Process(target=run_worker, args=(address, authkey), daemon=True)
+            process.start()
+            workers.append(process)
+
+    helper = threading.Thread(target=connect_silent_client_then_workers, daemon=True)
+    helper.start()
+    search = DistributedTaskGridSearchCV(
+        KillOnceClassifier(),
+        PARAM_GRID,
+        address=address,
+        authkey=authkey,
+        local_workers=0,
+        cv=3,
+    )
+    try:
+        _fit_with_timeout(search, x, y)
+    finally:
+        helper.join(5)
+        for process in workers:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+        for sock in silent:
+            sock.close()
+
+    assert silent, "cliente silencioso nao conectou"
+    _assert_same_results(search, x, y)
+
+def test_worker_command_runs_without_agent_credentials():
+    x, y = _data()
+    address = _free_address()
+    authkey = "chave-do-teste"
+    env = {name: value for name, value in os.environ.items() if name != "GEMINI_API_KEY"}
+    # O worker precisa importar KillOnceClassifier, definido neste modulo.
+    pythonpath = os.pathsep.join([str(PACKAGE_ROOT), str(Path(__file__).parent)])
+    env.update({AUTHKEY_ENV: authkey, "PYTHONPATH": pythonpath})
+    search = DistributedTaskGridSearchCV(
+        KillOnceClassifier(),
+        PARAM_GRID,
+        address=address,
+        authkey=authkey.encode(),
+        local_workers=0,
+        cv=3,
+    )
+
+    def start_worker():
+        # Espera o coordenador abrir a porta antes de iniciar o worker.
+        deadline = time.monotonic() + TIMEOUT_S
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(address, timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        return subprocess.Popen(
+            [sys.executable, "-m", "cardio_ai_model.training.worker", *map(str, address)],
+            cwd=PACKAGE_ROOT,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+
+    workers = []
+    helper = threading.Thread(target=lambda: workers.append(start_worker()), daemon=True)
+    helper.start()
+    try:
+        _fit_with_timeout(search, x, y)
+    finally:
+        helper.join(5)
+        for process in workers:
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    _assert_same_results(search, x, y)
+    out, err = workers[0].communicate()
+    assert workers[0].returncode == 0, err
+    assert "Worker encerrado" in out
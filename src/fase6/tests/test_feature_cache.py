@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import shutil
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from cardio_ai_model.config import DEFAULT_OUTLIER_RULES, get_default_config
+from cardio_ai_model.datapipeline import cache
+from cardio_ai_model.datapipeline.cache import feature_cache_key, load_cached_features
+from cardio_ai_model.datapipeline.data_pipeline import prepare_features
+
+DATASET = Path(__file__).resolve().parents[1] / "Dataset" / "cardio_train.csv"
+
+
+@pytest.fixture
+def config(tmp_path):
+    with DATASET.open("rb") as file:
+        sample = b"".join(file.readline() for _ in range(501))
+    dataset = tmp_path / "amostra.csv"
+    dataset.write_bytes(sample)
+    return replace(
+        get_default_config(),
+        dataset_path=dataset,
+        cache_dir=tmp_path / "cache",
+        pipeline_mode="eager",
+    )
+
+
+@pytest.fixture
+def feature_code(tmp_path, monkeypatch):
+    # Copia do codigo das features que o teste pode editar.
+    copy = tmp_path / "data_pipeline.py"
+    shutil.copy(cache._FEATURE_CODE_FILES[0], copy)
+    monkeypatch.setattr(cache, "_FEATURE_CODE_FILES", (copy, *cache._FEATURE_CODE_FILES[1:]))
+    return copy
+
+
+def test_cache_is_reused_for_same_code_config_and_data(config):
+    features, report = prepare_features(config)
+
+    cached, meta = load_cached_features(config)
+    assert cached.equals(features)
+    assert meta["registros"] == report.registros == 500
+
+
+def test_feature_code_change_invalidates_cache(config, feature_code):
+    prepare_features(config)
+    assert load_cached_features(config) is not None
+    key = feature_cache_key(config)
+
+    with feature_code.open("a", encoding="utf-8") as file:
+        file.write("\n# regra de engenharia de features alterada\n")
+
+    assert feature_cache_key(config) != key
+    assert load_cached_features(config) is None
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"drop_duplicates": True},
+        {"outlier_rules": DEFAULT_OUTLIER_RULES[1:]},
+        {"separator": ","},
+    ],
+)
+def test_feature_config_change_invalidates_cache(config, changes):
+    prepare_features(config)
+    assert load_cached_features(config) is not None
+
+    changed = replace(config, **changes)
+
+    assert feature_cache_key(changed) != feature_cache_key(config)
+    assert load_cached_features(changed) is None
+
+
+def test_source_change_invalidates_cache(config):
+    prepare_features(config)
+    assert load_cached_features(config) is not None
+    key = feature_cache_key(config)
+
+    with config.dataset_path.open("rb") as file:
+        lines = file.readlines()
+    config.dataset_path.write_bytes(b"".join(lines[:-1]))
+
+    assert feature_cache_key(config) != key
+    assert load_cached_features(config) is None
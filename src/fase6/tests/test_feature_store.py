@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from cardio_ai_model.config import get_default_config
+from cardio_ai_model.datapipeline.feature_store import ingest_batch, load_feature_store
+
+DATASET = Path(__file__).resolve().parents[1] / "Dataset" / "cardio_train.csv"
+
+
+def _dataset_lines(n_rows: int) -> tuple[bytes, list[bytes]]:
+    with DATASET.open("rb") as file:
+        header = file.readline()
+        return header, [file.readline() for _ in range(n_rows)]
+
+
+@pytest.fixture
+def config(tmp_path):
+    return replace(
+        get_default_config(),
+        feature_store_dir=tmp_path / "store",
+        cache_dir=None,
+        pipeline_mode="eager",
+    )
+
+
+def _reference_rows(tmp_path: Path, config, content: bytes) -> int:
+    # Mesmas linhas ingeridas de uma vez em um store novo.
+    path = tmp_path / "referencia.csv"
+    path.write_bytes(content)
+    reference = replace(config, feature_store_dir=tmp_path / "store-referencia")
+    ingest_batch(path, reference)
+    return load_feature_store(reference)[0].height
+
+
+def test_appended_rows_are_ingested_alone(tmp_path, config):
+    header, lines = _dataset_lines(1100)
+    batch = tmp_path / "lote.csv"
+    batch.write_bytes(header + b"".join(lines[:1000]))
+
+    first = ingest_batch(batch, config)
+    with batch.open("ab") as file:
+        file.write(b"".join(lines[1000:]))
+    second = ingest_batch(batch, config)
+
+    assert first.registros == 1000
+    assert second.registros == 100
+    assert ingest_batch(batch, config) is None
+    features, report = load_feature_store(config)
+    assert report.registros == 1100
+    assert features.height == _reference_rows(tmp_path, config, header + b"".join(lines))
+
+
+def test_rewritten_source_replaces_its_partitions(tmp_path, config):
+    header, lines = _dataset_lines(600)
+    batch = tmp_path / "lote.csv"
+    batch.write_bytes(header + b"".join(lines[:500]))
+    ingest_batch(batch, config)
+
+    batch.write_bytes(header + b"".join(lines[100:600]))
+    report = ingest_batch(batch, config)
+
+    assert report.registros == 500
+    assert load_feature_store(config)[1].registros == 500
+
+
+def test_partial_last_line_waits_for_its_newline(tmp_path, config):
+    header, lines = _dataset_lines(1100)
+    batch = tmp_path / "lote.csv"
+    # Ultima linha sem quebra: escritor ainda no meio da linha, ou arquivo sem
+    # "\n" final. Ela so entra junto com o proximo trecho.
+    batch.write_bytes(header + b"".join(lines[:999]) + lines[999].rstrip(b"\n"))
+
+    first = ingest_batch(batch, config)
+    with batch.open("ab") as file:
+        file.write(b"\n" + b"".join(lines[1000:]))
+    second = ingest_batch(batch, config)
+
+    assert first.registros == 999
+    assert second.registros == 101
+    features, report = load_feature_store(config)
+    assert report.registros == 1100
+    assert features.height == _reference_rows(tmp_path, config, header + b"".join(lines))
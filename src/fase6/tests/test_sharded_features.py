@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from cardio_ai_model.config import get_default_config
+from cardio_ai_model.datapipeline.data_pipeline import compute_features
+
+DATASET = Path(__file__).resolve().parents[1] / "Dataset" / "cardio_train.csv"
+
+
+def _with_new_id(line: bytes, new_id: int) -> bytes:
+    return str(new_id).encode() + line[line.index(b";"):]
+
+
+@pytest.fixture
+def sources(tmp_path):
+    with DATASET.open("rb") as file:
+        header = file.readline()
+        lines = [file.readline() for _ in range(600)]
+    # Mesma linha (com outro id) dentro de um shard e em shards diferentes.
+    shard_a = lines[:300] + [_with_new_id(lines[10], 900_001)]
+    shard_b = lines[300:] + [_with_new_id(lines[20], 900_002), _with_new_id(lines[310], 900_003)]
+
+    shards = tmp_path / "shards"
+    shards.mkdir()
+    (shards / "parte-1.csv").write_bytes(header + b"".join(shard_a))
+    (shards / "parte-2.csv").write_bytes(header + b"".join(shard_b))
+    single = tmp_path / "unico.csv"
+    single.write_bytes(header + b"".join(shard_a + shard_b))
+    return single, shards
+
+
+@pytest.mark.parametrize("drop_duplicates", [False, True])
+def test_sharded_run_matches_single_file(sources, drop_duplicates):
+    single, shards = sources
+    config = replace(
+        get_default_config(),
+        cache_dir=None,
+        pipeline_mode="eager",
+        shard_workers=2,
+        drop_duplicates=drop_duplicates,
+    )
+
+    expected, expected_report = compute_features(replace(config, dataset_path=single))
+    features, report = compute_features(replace(config, dataset_path=shards))
+
+    assert expected_report.duplicadas == 3
+    assert report == expected_report
+    assert features.columns == expected.columns
+    assert features.equals(expected)